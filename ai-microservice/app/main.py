@@ -1,5 +1,9 @@
+import asyncio
+import json
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 
 # ======================= SCHEMAS =======================
 from schemas.request import (
@@ -10,6 +14,7 @@ from schemas.response import (
     QueryResponse,
     SectionSearchResponse,
     SectionSearchResult,
+    TranslationResult,
 )
 from schemas.summary import (
     SectionSummaryRequest,
@@ -17,11 +22,31 @@ from schemas.summary import (
 )
 
 # ======================= CORE AI =======================
-from core.pipeline import process_query
-from services.language import detect_language, resolve_language_code
-from services.translation import translate_to_english, translate_from_english
-from services.embeddings import retrieve_sections
-from services.summarizer import summarize_text   # ✅ YOUR REAL AI SUMMARIZER
+from core.pipeline import process_query, stream_query
+from services.language import detect_language, resolve_language_code, language_stats
+from services.translation import (
+    translate_to_english,
+    translate_from_english,
+    translate_many_from_english,
+    cached_translation,
+    submit_translation,
+    get_translation,
+    translation_cache_stats,
+)
+from services.citations import match_citation
+from services.embeddings import embedding_cache_stats, embedding_batch_stats
+from services.retrieval import hybrid_retrieve, retrieval_stats
+from services.reranker import reranker_stats
+from services.context import context_stats
+from services.grounding import grounding_stats
+from services.summarizer import (   # ✅ YOUR REAL AI SUMMARIZER
+    summarize_section as summarize_section_cached,
+    summary_cache_stats,
+)
+from services.llm import close_groq_client
+from services.answer_cache import answer_cache
+from services.warmup import start_background_warmup, readiness, is_ready
+from config import WARMUP_ON_STARTUP
 
 app = FastAPI(title="LawGuide India - AI Microservice")
 
@@ -39,58 +64,152 @@ app.add_middleware(
 # ======================= ✅✅✅ END CORS =======================
 
 
+# ======================= ✅ LIFECYCLE =======================
+@app.on_event("startup")
+async def warm_models():
+    # Bind immediately; index + models load once in the background (see /ready)
+    if WARMUP_ON_STARTUP:
+        start_background_warmup()
+
+
+@app.on_event("shutdown")
+async def shutdown_clients():
+    # Release pooled Groq connections cleanly
+    await close_groq_client()
+    if answer_cache is not None:
+        answer_cache.persist()
+
+
 # ======================= ✅ HEALTH =======================
 @app.get("/health")
 def health_check():
     return {"status": "ok", "message": "AI microservice running"}
 
 
+# ======================= ✅ READINESS =======================
+@app.get("/ready")
+def ready_check():
+    """200 once the index and models are loaded and warmed up, 503 until then."""
+    if not WARMUP_ON_STARTUP:
+        # Models load lazily on first request; nothing to wait for
+        return {"status": "lazy"}
+    state = readiness()
+    return JSONResponse(status_code=200 if is_ready() else 503, content=state)
+
+
+# ======================= ✅ CACHE / PERFORMANCE STATS =======================
+@app.get("/stats")
+def stats():
+    return {
+        "translation_cache": translation_cache_stats(),
+        "answer_cache": answer_cache.stats if answer_cache is not None else None,
+        "summary_cache": summary_cache_stats(),
+        "embedding_cache": embedding_cache_stats(),
+        "embedding_batches": embedding_batch_stats(),
+        "reranker": reranker_stats(),
+        "retrieval": retrieval_stats(),
+        "context": context_stats(),
+        "grounding": grounding_stats(),
+        "language": language_stats(),
+    }
+
+
 # ======================= ✅ CHATBOT (RAG + GROQ) =======================
 @app.post("/answer", response_model=QueryResponse)
 async def answer_query(payload: QueryRequest):
     return await process_query(payload)
 
 
+# ======================= ✅ CHATBOT STREAMING (SSE) =======================
+@app.post("/answer/stream")
+async def answer_query_stream(payload: QueryRequest):
+    """
+    Server-sent events version of /answer.
+    Events: intent → sections → token* → final (QueryResponse payload),
+    or a terminal error event (api_overload QueryResponse) if the pipeline fails.
+    """
+
+    async def event_source():
+        async for event, data in stream_query(payload):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ======================= ✅ SEMANTIC SEARCH (LAW BROWSER) =======================
 @app.post("/search-sections", response_model=SectionSearchResponse)
 async def search_sections(payload: SectionSearchRequest):
     """
-    Semantic section search using Chroma + embeddings
+    Hybrid section search (dense embeddings + BM25, rank-fused).
+    Citation queries ("S. 302 IPC", "धारा 303") are answered from the exact
+    (act, section) index instead.
+    Non-English results are translated concurrently; with lazy_translation=true
+    the English text is returned immediately along with a translation_id per
+    result that can be fetched from /translations/{translation_id}.
+    Lazy mode is opt-in: the backend (lawsController.ts) and the frontend call
+    this endpoint without it and get the concurrent path.
     """
 
-    detected_lang = detect_language(payload.query_text, payload.user_language)
-
-    normalized_query = translate_to_english(
-        payload.query_text.strip(), detected_lang
+    detected_lang = await asyncio.to_thread(
+        detect_language, payload.query_text, payload.user_language
     )
-    if not normalized_query:
-        normalized_query = payload.query_text.strip()
 
     user_state = payload.user_state or "India"
 
-    docs = retrieve_sections(
-        normalized_query,
-        user_state,
-        top_k=payload.top_k or 20
-    )
+    # Exact citation ("Section 303 BNS") → the section itself, no vector search;
+    # a number several acts share ("section 302") is searched like any other query
+    citation = await asyncio.to_thread(match_citation, payload.query_text, user_state)
+    if citation is not None and not citation.ambiguous:
+        docs = citation.docs[:payload.top_k or 20]
+    else:
+        normalized_query = await asyncio.to_thread(
+            translate_to_english, payload.query_text.strip(), detected_lang
+        )
+        if not normalized_query:
+            normalized_query = payload.query_text.strip()
 
-    results = []
-    for d in docs:
-        text_en = d["text"]
+        docs = await asyncio.to_thread(
+            hybrid_retrieve,
+            normalized_query,
+            user_state,
+            top_k=payload.top_k or 20
+        )
 
-        if detected_lang != "en":
-            text_user = translate_from_english(text_en, detected_lang)
-        else:
-            text_user = text_en
+    texts_en = [d["text"] for d in docs]
+    translation_ids = [None] * len(docs)
 
+    if detected_lang == "en":
+        texts_user = texts_en
+    elif payload.lazy_translation:
+        texts_user = []
+        # One worker-thread hop for all cache reads (the disk tier is SQLite)
+        cached_texts = await asyncio.to_thread(
+            lambda: [cached_translation(text_en, detected_lang) for text_en in texts_en]
+        )
+        for i, (text_en, cached) in enumerate(zip(texts_en, cached_texts)):
+            if cached is not None:
+                texts_user.append(cached)
+            else:
+                texts_user.append(text_en)
+                translation_ids[i] = submit_translation(text_en, detected_lang)
+    else:
+        texts_user = await translate_many_from_english(texts_en, detected_lang)
+
+    results = []
+    for d, text_user, translation_id in zip(docs, texts_user, translation_ids):
         results.append(
             SectionSearchResult(
                 act=d["act"],
                 section=d["section"],
                 text_primary=text_user,
-                text_english=text_en,
+                text_english=d["text"],
                 jurisdiction=d["jurisdiction"],
                 source_link=d.get("sourceLink") or d.get("source_link") or None,
+                translation_id=translation_id,
             )
         )
 
@@ -101,6 +220,23 @@ async def search_sections(payload: SectionSearchRequest):
     )
 
 
+# ======================= ✅ LAZY SECTION TRANSLATIONS =======================
+@app.get("/translations/{translation_id}", response_model=TranslationResult)
+async def fetch_translation(translation_id: str, wait: float = 10.0):
+    """
+    Fetch a translation started by /search-sections (lazy mode).
+    Waits up to `wait` seconds; returns status "pending" if still running.
+    """
+    try:
+        text = await get_translation(translation_id, timeout=max(0.0, min(wait, 30.0)))
+    except KeyError:
+        return TranslationResult(translation_id=translation_id, status="unknown")
+
+    if text is None:
+        return TranslationResult(translation_id=translation_id, status="pending")
+    return TranslationResult(translation_id=translation_id, status="done", text=text)
+
+
 # ======================= ✅ ✅ ✅ REAL AI LEGAL SUMMARY =======================
 @app.post("/summarize-section", response_model=SectionSummaryResponse)
 async def summarize_section(payload: SectionSummaryRequest):
@@ -115,17 +251,7 @@ async def summarize_section(payload: SectionSummaryRequest):
             summary="The selected legal text is too short to generate a meaningful explanation."
         )
 
-    # STEP 1 — convert section to English
-    normalized_text = translate_to_english(raw_text, "auto")
-
-    # STEP 2 — summarize in stable English
-    summary_en = summarize_text(normalized_text)
-
-    # STEP 3 — translate ONLY if language != en
-    if user_language.lower() != "en":
-        summary_local = translate_from_english(summary_en, user_language)
-    else:
-        summary_local = summary_en
+    # English summary + localized variant are cached; concurrent calls are coalesced
+    summary_local = await summarize_section_cached(raw_text, user_language)
 
     return SectionSummaryResponse(summary=summary_local)
-
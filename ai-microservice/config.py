@@ -13,16 +13,118 @@ GROQ_MODEL_NAME = "llama-3.1-8b-instant"
 if not GROQ_API_KEY:
     raise ValueError("❌ GROQ_API_KEY missing in .env — cannot start microservice.")
 
+# 🌐 Groq HTTP connection pool (shared async client, keep-alive)
+GROQ_HTTP2 = os.getenv("GROQ_HTTP2", "true").lower() == "true"
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "10"))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30"))  # seconds
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))  # seconds
+GROQ_READ_TIMEOUT = float(os.getenv("GROQ_READ_TIMEOUT", "40"))  # seconds
+
 # 🧠 Model Names
 EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 RERANKER_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 
+# 🧮 Query embedding memoization (LRU, bounded by entries and memory)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_MAX_MB = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "32"))
+
+# 📦 Embedding micro-batching (concurrent encode calls share one forward pass)
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+
+# 🏅 Cross-encoder reranker
+RERANKER_MAX_LENGTH = int(os.getenv("RERANKER_MAX_LENGTH", "512"))  # tokens per (query, section) pair
+RERANKER_BATCH_SIZE = int(os.getenv("RERANKER_BATCH_SIZE", "32"))  # predict() batch size
+RERANKER_MAX_BATCH_PAIRS = int(os.getenv("RERANKER_MAX_BATCH_PAIRS", "64"))  # pairs merged across requests
+RERANKER_BATCH_MAX_WAIT_MS = float(os.getenv("RERANKER_BATCH_MAX_WAIT_MS", "5"))
+RERANKER_CACHE_SIZE = int(os.getenv("RERANKER_CACHE_SIZE", "50000"))  # cached (query, section) scores
+
 # 📍 ChromaDB config
 CHROMA_DB_DIR = "./chroma_db"
 
+# 🗄 Vector store behind retrieval: "chroma" (HNSW, default) or "numpy"
+# (exact search over a memory-mapped snapshot from `python -m scripts.snapshot export`)
+VECTOR_STORE = os.getenv("VECTOR_STORE", "chroma").lower()
+VECTOR_SNAPSHOT_DIR = os.getenv("VECTOR_SNAPSHOT_DIR", "")
+# Index is partitioned by state; a query searches central + its state's partition in parallel
+PARTITION_SEARCH_WORKERS = int(os.getenv("PARTITION_SEARCH_WORKERS", "8"))
+
+# ✂ Ingest chunking: sections longer than this become overlapping passages
+# (all-MiniLM-L6-v2 truncates at 256 word-pieces ≈ 180-200 English words)
+CHUNK_MAX_WORDS = int(os.getenv("CHUNK_MAX_WORDS", "180"))
+CHUNK_OVERLAP_WORDS = int(os.getenv("CHUNK_OVERLAP_WORDS", "30"))
+
+# 🔎 Hybrid retrieval: BM25 (built by scripts/ingest.py) + Chroma, fused with RRF
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+BM25_INDEX_DIR = os.getenv("BM25_INDEX_DIR", "./bm25_index")
+RRF_K = int(os.getenv("RRF_K", "60"))  # reciprocal rank fusion constant
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "30"))  # per-retriever depth before fusion
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "12"))  # fused candidates sent to the reranker (/answer)
+
+# 📦 LLM context packing: most query-relevant sentences of the reranked sections,
+# filled up to a token budget (replaces a fixed top-N section cut)
+CONTEXT_CANDIDATES = int(os.getenv("CONTEXT_CANDIDATES", "10"))  # reranked sections offered to the packer
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1800"))  # generate_answer
+VALIDATION_CONTEXT_TOKEN_BUDGET = int(os.getenv("VALIDATION_CONTEXT_TOKEN_BUDGET", "1200"))  # validate_answer
+CONTEXT_RANK_PENALTY = float(os.getenv("CONTEXT_RANK_PENALTY", "0.02"))  # sentence score penalty per rerank position
+CONTEXT_SENTENCE_CACHE_SIZE = int(os.getenv("CONTEXT_SENTENCE_CACHE_SIZE", "50000"))  # cached sentence embeddings
+
+# 🗃 Semantic answer cache (LEGAL path of /answer)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))  # cosine
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(24 * 3600)))  # seconds
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000"))
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH") or None  # e.g. ./cache/answers.pkl
+
+# 🌍 Translation cache (in-memory LRU + on-disk SQLite shared by workers)
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "5000"))
+TRANSLATION_CACHE_DB = os.getenv("TRANSLATION_CACHE_DB", "./cache/translations.sqlite3") or None  # "" disables disk tier
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "8"))  # parallel translator calls per worker
+TRANSLATION_JOB_TTL = float(os.getenv("TRANSLATION_JOB_TTL", "600"))  # seconds a lazy translation handle stays valid
+
+# 📝 Section summary cache (/summarize-section)
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "2000"))
+SUMMARY_CACHE_DB = os.getenv("SUMMARY_CACHE_DB", "./cache/summaries.sqlite3") or None  # "" disables disk tier
+
+# 🔖 Citations that don't name an act ("section 302", "धारा 302"): acts to assume, in order of
+# preference (comma-separated names or short forms, e.g. "BNS,IPC"). With none
+# matching, a number shared by several acts is ambiguous and goes through retrieval instead.
+CITATION_PRIMARY_ACTS = [a.strip() for a in os.getenv("CITATION_PRIMARY_ACTS", "").split(",") if a.strip()]
+
+# 🔤 Language detection: Indic scripts are read off their Unicode block; Latin / mixed
+# text goes to fastText's language-ID model, loaded once (langdetect if the model is missing).
+# Model: https://dl.fbaipublicfiles.com/fasttext/supervised-models/lid.176.ftz
+LANGUAGE_ID_MODEL_PATH = os.getenv("LANGUAGE_ID_MODEL_PATH", "./models/lid.176.ftz")
+LANGUAGE_ID_MIN_CONFIDENCE = float(os.getenv("LANGUAGE_ID_MIN_CONFIDENCE", "0.5"))  # below → user profile language
+LANGUAGE_DETECT_CACHE_SIZE = int(os.getenv("LANGUAGE_DETECT_CACHE_SIZE", "10000"))
+
+# 🧭 On-box intent classifier (kNN over MiniLM embeddings of labelled examples);
+# below the thresholds classify_intent defers to Groq. Evaluate: python -m scripts.eval_intent
+INTENT_LOCAL_CLASSIFIER = os.getenv("INTENT_LOCAL_CLASSIFIER", "true").lower() == "true"
+INTENT_EXAMPLES_PATH = os.getenv("INTENT_EXAMPLES_PATH", "./data/intent_examples.jsonl")
+INTENT_KNN_K = int(os.getenv("INTENT_KNN_K", "7"))
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.7"))  # weighted vote share
+INTENT_MIN_SIMILARITY = float(os.getenv("INTENT_MIN_SIMILARITY", "0.45"))  # nearest example cosine
+
 # 🧪 Confidence threshold for safe output
 CONFIDENCE_THRESHOLD = 0.75
 
+# ✅ Answer validation: "local" (citation + embedding grounding check, LLM only when uncertain) or "llm"
+GROUNDING_VALIDATOR = os.getenv("GROUNDING_VALIDATOR", "local").lower()
+GROUNDING_ACCEPT = float(os.getenv("GROUNDING_ACCEPT", "0.6"))  # local score ≥ this → valid without the LLM
+GROUNDING_REJECT = float(os.getenv("GROUNDING_REJECT", "0.2"))  # local score < this → invalid without the LLM
+GROUNDING_SUPPORT_SIMILARITY = float(os.getenv("GROUNDING_SUPPORT_SIMILARITY", "0.5"))  # claim ↔ source cosine
+
 # 🔧 System config
 DEVICE = "cpu"  # or "cuda" if future GPU enabled
+
+# ⚡ Inference backend for embeddings + reranker: "torch" (default) or "onnx"
+# ONNX models are produced by `python -m scripts.export_onnx`; falls back to PyTorch if missing.
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch").lower()
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "./onnx_models")
+ONNX_QUANTIZED = os.getenv("ONNX_QUANTIZED", "true").lower() == "true"  # dynamic int8 weights
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", str(min(4, os.cpu_count() or 1))))
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+# Load models + index in a background thread at startup (report progress on /ready)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
@@ -0,0 +1,181 @@
+# core/bm25.py
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Kept short on purpose: legal terms of art ("shall", "whoever", "may") matter
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have i if in into is it its me my of on or "
+    "our so than that the their them then there these they this to was we were what "
+    "when where which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens; section numbers like '302' / '376a' are kept."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index stored as CSR arrays:
+
+        offsets[term_id] : offsets[term_id + 1]  → slice of postings
+        postings_docs    int32  document row per posting
+        postings_tfs     uint16 term frequency per posting
+
+    Saved as plain .npy files (+ meta.json with vocabulary and doc ids) so the
+    postings are memory-mapped on load instead of unpickled.
+    """
+
+    FILES = ("offsets", "postings_docs", "postings_tfs", "doc_lens", "doc_states")
+
+    def __init__(
+        self,
+        vocab: Sequence[str],
+        doc_ids: Sequence[str],
+        states: Sequence[str],
+        arrays: Dict[str, np.ndarray],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.term_ids = {term: i for i, term in enumerate(vocab)}
+        self.vocab = list(vocab)
+        self.doc_ids = list(doc_ids)
+        self.states = list(states)
+        self._state_codes = {s: i for i, s in enumerate(self.states)}
+        self.offsets = arrays["offsets"]
+        self.postings_docs = arrays["postings_docs"]
+        self.postings_tfs = arrays["postings_tfs"]
+        self.doc_lens = arrays["doc_lens"]
+        self.doc_states = arrays["doc_states"]
+        self.k1 = k1
+        self.b = b
+
+        n = len(self.doc_ids)
+        df = np.diff(self.offsets).astype(np.float32)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(self.doc_lens.mean()) if n else 1.0
+        # Per-document length normalisation, precomputed once
+        self._norm = (k1 * (1 - b + b * self.doc_lens / max(avgdl, 1e-9))).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    # ---------------- build ----------------
+    @classmethod
+    def build(
+        cls,
+        doc_ids: Sequence[str],
+        texts: Iterable[str],
+        states: Sequence[Optional[str]],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "BM25Index":
+        return cls.from_rows(zip(doc_ids, texts, states), k1=k1, b=b)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Tuple[str, str, Optional[str]]],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "BM25Index":
+        """Build from a stream of (doc id, text, state); texts are not kept in memory."""
+        vocab: Dict[str, int] = {}
+        postings: List[List[Tuple[int, int]]] = []
+        doc_ids, states, doc_lens = [], [], []
+
+        for row, (doc_id, text, state) in enumerate(rows):
+            doc_ids.append(doc_id)
+            states.append(state or "")
+            tokens = tokenize(text or "")
+            doc_lens.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_id = vocab.setdefault(term, len(vocab))
+                if term_id == len(postings):
+                    postings.append([])
+                postings[term_id].append((row, tf))
+
+        state_names = sorted(set(states))
+        codes = {s: i for i, s in enumerate(state_names)}
+
+        offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(p) for p in postings])
+        flat = [p for plist in postings for p in plist]
+        arrays = {
+            "offsets": offsets,
+            "postings_docs": np.fromiter((d for d, _ in flat), dtype=np.int32, count=len(flat)),
+            "postings_tfs": np.fromiter((min(tf, 65535) for _, tf in flat), dtype=np.uint16, count=len(flat)),
+            "doc_lens": np.asarray(doc_lens, dtype=np.int32),
+            "doc_states": np.asarray([codes[s] for s in states], dtype=np.int16),
+        }
+        return cls(list(vocab), doc_ids, state_names, arrays, k1=k1, b=b)
+
+    # ---------------- persistence ----------------
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            "offsets": self.offsets,
+            "postings_docs": self.postings_docs,
+            "postings_tfs": self.postings_tfs,
+            "doc_lens": self.doc_lens,
+            "doc_states": self.doc_states,
+        }
+        for name, arr in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), arr)
+        meta = {
+            "k1": self.k1,
+            "b": self.b,
+            "vocab": self.vocab,
+            "doc_ids": self.doc_ids,
+            "states": self.states,
+        }
+        # meta.json is written last (atomically): its presence marks a complete index
+        tmp = os.path.join(directory, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(directory, "meta.json"))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "BM25Index":
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in cls.FILES
+        }
+        return cls(meta["vocab"], meta["doc_ids"], meta["states"], arrays, k1=meta["k1"], b=meta["b"])
+
+    # ---------------- search ----------------
+    def search(self, query: str, top_k: int = 20, states: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+        """(doc id, score) pairs for the best `top_k` documents, optionally limited to `states`."""
+        term_ids = [self.term_ids[t] for t in set(tokenize(query)) if t in self.term_ids]
+        if not term_ids or not self.doc_ids:
+            return []
+
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.postings_docs[start:end]
+            tfs = self.postings_tfs[start:end].astype(np.float32)
+            # Each doc appears once per term's postings, so plain fancy-index += is safe
+            scores[docs] += self.idf[term_id] * tfs * (self.k1 + 1) / (tfs + self._norm[docs])
+
+        if states is not None:
+            codes = [self._state_codes[s] for s in states if s in self._state_codes]
+            scores[~np.isin(self.doc_states, codes)] = 0.0
+
+        candidates = np.flatnonzero(scores)
+        if candidates.size == 0:
+            return []
+        if candidates.size > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        return [(self.doc_ids[i], float(scores[i])) for i in candidates]
@@ -0,0 +1,246 @@
+# core/cache.py
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache with optional TTL and hit/miss counters.
+    Shared by the microservice caches (answers, translations, summaries, ...).
+
+    Capacity is bounded by entry count and, if `max_bytes` is set, by the total
+    size reported by `sizeof(value)`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl  # seconds; None = never expires
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda _: 0)
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = item
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._put(key, value, expires_at)
+            self._evict()
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._remove(key)
+        return item[0] if item else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Snapshot of live (key, value) pairs, least recently used first. Does not touch recency."""
+        now = time.time()
+        with self._lock:
+            live = [
+                (k, v) for k, (v, exp, _) in self._data.items()
+                if exp is None or exp > now
+            ]
+        return iter(live)
+
+    def dump(self) -> List[Tuple[Hashable, Any, Optional[float]]]:
+        """Serializable copy of the cache contents (for on-disk persistence)."""
+        with self._lock:
+            return [(k, v, exp) for k, (v, exp, _) in self._data.items()]
+
+    def load(self, entries: List[Tuple[Hashable, Any, Optional[float]]]) -> None:
+        """Restore entries produced by `dump()`, skipping expired ones."""
+        now = time.time()
+        with self._lock:
+            for key, value, expires_at in entries:
+                if expires_at is not None and expires_at <= now:
+                    continue
+                self._put(key, value, expires_at)
+            self._evict()
+
+    def _put(self, key: Hashable, value: Any, expires_at: Optional[float]) -> None:
+        self._remove(key)
+        nbytes = self._sizeof(value)
+        self._data[key] = (value, expires_at, nbytes)
+        self._bytes += nbytes
+
+    def _remove(self, key: Hashable):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
+        return item
+
+    def _evict(self) -> None:
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, _, nbytes) = self._data.popitem(last=False)
+            self._bytes -= nbytes
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SqliteStore:
+    """
+    Persistent key/value store on SQLite, shared by all workers on a host.
+    WAL mode lets several processes read while one writes; each thread gets
+    its own connection. Values are stored as text.
+    """
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.table = f"kv_{namespace}"
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            row = self._conn().execute(
+                f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"⚠ Cache read failed ({self.path}): {e}")
+            return None
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        try:
+            conn = self._conn()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"⚠ Cache write failed ({self.path}): {e}")
+
+    def __len__(self) -> int:
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+def content_key(*parts: str) -> str:
+    """Stable content-addressed key: sha256 over the parts (NUL-separated)."""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """
+    In-memory LRU in front of an optional SqliteStore.
+    Disk hits are promoted to memory; counters are kept per tier.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 1024, path: Optional[str] = None):
+        self.namespace = namespace
+        self.memory = LRUCache(max_entries=max_entries)
+        self.disk = SqliteStore(path, namespace) if path else None
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_size": len(self.memory),
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent async calls for the same key into one execution.
+    Later callers await the first caller's result instead of repeating the work.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller disconnecting must not cancel the shared work
+        return await asyncio.shield(future)
@@ -0,0 +1,131 @@
+# core/chunking.py
+import re
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# A section starts on its own line: "303. Theft.—", "Section 173. ...", "376A) ..."
+SECTION_HEADING = re.compile(r"^\s*(?:Section\s*)?(\d+)([A-Z]?)[\.\-:\)]\s*(.*)$")
+# Largest jump between consecutive section numbers accepted as a real boundary;
+# numbered list items / illustrations inside a section don't restart the count.
+MAX_SECTION_GAP = 25
+# A numbering run whose sections never exceed this many lines is a contents table
+TOC_MAX_LINES = 2
+
+_SENTENCE_END = re.compile(r"(?<=[.;:?!—])\s+")
+
+
+def segment_sections(pages: Iterable[Tuple[int, str]]) -> Iterator[Dict]:
+    """
+    Single pass over (page number, text) pairs, line by line, yielding one dict per
+    section: number, text, page_start/page_end and char_start/char_end offsets into
+    the concatenated document (pages joined by newlines). Linear in the input size.
+    """
+    current = None
+    last_number = 0
+    offset = 0
+    run_max_lines = 0  # longest section so far in this numbering run (contents tables: 1-2 lines each)
+
+    def finish(section, end):
+        section["text"] = "\n".join(section.pop("lines")).strip()
+        section.pop("body_lines", None)
+        section["char_end"] = end
+        return section
+
+    for page_no, page_text in pages:
+        for line in page_text.split("\n"):
+            m = SECTION_HEADING.match(line)
+            number = int(m.group(1)) if m else None
+            is_boundary = m is not None and (
+                # start, or numbering restarts after a long run / a contents table
+                (current is None or number == 1 and (last_number > MAX_SECTION_GAP or run_max_lines <= TOC_MAX_LINES))
+                and number <= MAX_SECTION_GAP
+                or current is not None and (
+                    last_number < number <= last_number + MAX_SECTION_GAP
+                    or number == last_number and m.group(2) > current["number"][len(str(number)):]
+                )
+            )
+            if is_boundary:
+                if number == 1:
+                    run_max_lines = 0
+                if current is not None:
+                    yield finish(current, offset)
+                current = {
+                    "number": f"{number}{m.group(2)}",
+                    "lines": [m.group(3)],
+                    "page_start": page_no,
+                    "page_end": page_no,
+                    "char_start": offset,
+                }
+                last_number = number
+            elif current is not None:
+                current["lines"].append(line)
+                current["page_end"] = page_no
+                if line.strip():
+                    current["body_lines"] = current.get("body_lines", 0) + 1
+                    run_max_lines = max(run_max_lines, current["body_lines"])
+            offset += len(line) + 1
+
+    if current is not None:
+        yield finish(current, offset)
+
+
+def body_sections(sections: Iterable[Dict]) -> List[Dict]:
+    """
+    One entry per section number, keeping the longest text: an act's
+    "Arrangement of Sections" lists every section again as a one-line entry.
+    """
+    best: Dict[str, Dict] = {}
+    for sec in sections:
+        if sec["text"] and len(sec["text"]) > len(best.get(sec["number"], {}).get("text", "")):
+            best[sec["number"]] = sec
+    return list(best.values())
+
+
+def strip_markdown(text: str) -> str:
+    """Plain text from the dataset's Markdown: no images, link targets, emphasis, tables or HTML."""
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", " ", text)           # images
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)          # [label](url) → label
+    text = re.sub(r"<[^>\n]+>", " ", text)                        # html tags
+    text = re.sub(r"^\s{0,3}#{1,6}\s*", "", text, flags=re.M)     # headings
+    text = re.sub(r"^\s*>\s?", "", text, flags=re.M)              # blockquotes
+    text = re.sub(r"^\s*(?:[-*_]\s*){3,}$", "", text, flags=re.M)  # horizontal rules
+    text = re.sub(r"^\s*\|?(?:\s*:?-+:?\s*\|)+\s*$", "", text, flags=re.M)  # table separators
+    text = text.replace("|", " ")
+    text = re.sub(r"(\*\*|__|\*|`)", "", text)                    # emphasis / code marks
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n\s*\n+", "\n\n", text)
+    return text.strip()
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences / clauses of a section (legal text breaks on ".", ";", ":" and "—")."""
+    return [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def split_passages(text: str, max_words: int = 180, overlap_words: int = 30) -> List[str]:
+    """
+    Split text into passages of at most `max_words` words, breaking at sentence
+    ends where possible; consecutive passages share ~`overlap_words` words.
+    Text that already fits is returned as a single passage.
+    """
+    words_total = len(text.split())
+    if words_total <= max_words:
+        return [text] if text.strip() else []
+
+    # Sentences, with over-long ones cut into max_words pieces
+    units: List[List[str]] = []
+    for sentence in split_sentences(text):
+        words = sentence.split()
+        for i in range(0, len(words), max_words):
+            if words[i:i + max_words]:
+                units.append(words[i:i + max_words])
+
+    passages, current = [], []
+    for unit in units:
+        if current and len(current) + len(unit) > max_words:
+            passages.append(" ".join(current))
+            tail = current[-overlap_words:] if overlap_words else []
+            current = tail if len(tail) + len(unit) <= max_words else []
+        current = current + unit
+    if current:
+        passages.append(" ".join(current))
+    return passages
@@ -0,0 +1,75 @@
+# core/graph.py
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, Dict, Tuple
+
+
+class StageGraph:
+    """
+    Tiny async dependency graph used by the query pipeline.
+
+    Each stage is registered with the names of the stages it depends on.
+    Starting (or awaiting) a stage starts its dependencies first, so stages
+    that don't depend on each other run concurrently. Coroutine functions are
+    awaited on the event loop; plain functions run in a worker thread so
+    CPU / blocking network work never stalls other requests.
+
+    Stages are started lazily and can be started speculatively with `start()`;
+    work that turns out to be unnecessary is dropped with `cancel()`.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+        self._tasks: Dict[str, asyncio.Future] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], *deps: str) -> None:
+        """Register `fn` as stage `name`; it is called with the results of `deps` in order."""
+        self._stages[name] = (fn, deps)
+
+    def start(self, *names: str) -> None:
+        """Kick off stages (and their dependencies) without waiting for them."""
+        for name in names:
+            self._task(name)
+
+    async def result(self, name: str) -> Any:
+        """Wait for a stage's result, starting it if needed."""
+        # shield: a cancelled caller must not cancel a stage other stages share
+        return await asyncio.shield(self._task(name))
+
+    def cancel(self, *names: str) -> None:
+        """Cancel stages whose results are no longer needed."""
+        for name in names:
+            task = self._tasks.get(name)
+            if task is not None and not task.done():
+                logging.info(f"✂ Cancelling stage: {name}")
+                task.cancel()
+
+    def cancel_pending(self) -> None:
+        """Cancel every stage still running (call once the response is built)."""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+    def _task(self, name: str) -> asyncio.Future:
+        task = self._tasks.get(name)
+        if task is None:
+            fn, deps = self._stages[name]
+            task = asyncio.ensure_future(self._run(fn, deps))
+            # Speculative stages may fail or be abandoned unobserved; swallow those quietly
+            task.add_done_callback(_consume_exception)
+            self._tasks[name] = task
+        return task
+
+    async def _run(self, fn: Callable[..., Any], deps: Tuple[str, ...]) -> Any:
+        dep_tasks = [self._task(dep) for dep in deps]
+        args = [await asyncio.shield(t) for t in dep_tasks]
+
+        if inspect.iscoroutinefunction(fn):
+            return await fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+
+def _consume_exception(task: asyncio.Future) -> None:
+    if not task.cancelled():
+        task.exception()
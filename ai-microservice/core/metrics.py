@@ -0,0 +1,52 @@
+# core/metrics.py
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator
+
+import numpy as np
+
+
+class LatencyTracker:
+    """
+    Rolling latency stats (count, mean, p50, p95) per named component,
+    over the last `window` samples of each. Reported on /stats.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, ms: float) -> None:
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.window)
+                self._counts[name] = 0
+            self._samples[name].append(ms)
+            self._counts[name] += 1
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {name: (list(s), self._counts[name]) for name, s in self._samples.items()}
+        out = {}
+        for name, (samples, count) in snapshot.items():
+            arr = np.asarray(samples, dtype=np.float64)
+            out[name] = {
+                "count": count,
+                "mean_ms": round(float(arr.mean()), 2),
+                "p50_ms": round(float(np.percentile(arr, 50)), 2),
+                "p95_ms": round(float(np.percentile(arr, 95)), 2),
+            }
+        return out
@@ -1,28 +1,287 @@
 # core/pipeline.py
+import asyncio
 import random
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from schemas.request import QueryRequest
 from schemas.response import QueryResponse, RetrievedSection
 from services.language import detect_language
-from services.translation import translate_to_english, translate_from_english
-from services.embeddings import retrieve_sections
+from services.translation import translate_to_english, translate_from_english_async
+from services.embeddings import embed_query, index_fingerprint
+from services.retrieval import hybrid_retrieve
 from services.reranker import rerank_sections
-from services.reranker import rerank_sections
-from services.llm import generate_answer, validate_answer, classify_intent, chat_general
+from services.answer_cache import answer_cache
+from services.citations import CitationMatch, match_citation
+from services.context import pack_context
+from services.llm import LLMStreamError, generate_answer, generate_answer_stream, classify_intent, chat_general
+from services.grounding import validate_grounding
+from core.graph import StageGraph
 from core.validation import ValidationResult
-from config import CONFIDENCE_THRESHOLD
+from config import CONFIDENCE_THRESHOLD, CONTEXT_CANDIDATES, CONTEXT_TOKEN_BUDGET, VALIDATION_CONTEXT_TOKEN_BUDGET
 
+# Progress callback used by the streaming endpoint: emit(event_name, data)
+Emit = Callable[[str, Dict[str, Any]], None]
 
-async def process_query(payload: QueryRequest) -> QueryResponse:
-    # 🌟 Step 0: Dynamic Intent Classification (LLM)
-    intent = classify_intent(payload.query_text)
-    print(f"🧠 Detected Intent: {intent}")
 
-    # Determine desired language early (so GENERAL replies can be localized)
+def _resolve_language(payload: QueryRequest) -> str:
     detected_lang = detect_language(payload.query_text, payload.user_language)
     # SAFE fallback — prevent empty or invalid languages
     if not detected_lang or detected_lang.strip() == "":
         detected_lang = payload.user_language or "en"
+    return detected_lang
+
+
+async def _localize(text: str, lang: str) -> str:
+    """Translate an English message for the user without blocking the event loop."""
+    if lang == "en":
+        return text
+    return await translate_from_english_async(text, lang)
+
+
+def _to_retrieved(sections: List[Dict[str, Any]]) -> List[RetrievedSection]:
+    return [RetrievedSection(**{
+        "act": s["act"],
+        "section": s["section"],
+        "text": s["text"],
+        "jurisdiction": s["jurisdiction"],
+        "source_link": s.get("source_link", "")
+    }) for s in sections]
+
+
+def _in_context(reranked: List[Dict[str, Any]], context: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reranked sections (full text) that made it into the packed LLM context, in rank order."""
+    packed = {(s.get("id"), s["act"], s["section"]) for s in context}
+    return [s for s in reranked if (s.get("id"), s["act"], s["section"]) in packed]
+
+
+def _remember(payload: QueryRequest, embedding, index_version: str, response: QueryResponse) -> None:
+    """
+    Store a validated LEGAL answer in the semantic cache (language-independent fields only).
+    Blocking (periodically pickles the cache to disk): run it off the event loop.
+    """
+    if answer_cache is None or embedding is None:
+        return
+    answer_cache.store(
+        embedding,
+        payload.user_state or "India",
+        payload.explanation_mode,
+        index_version,
+        response.model_dump(exclude={"answer_primary", "detected_language"}),
+    )
+
+
+def _build_graph(
+    payload: QueryRequest,
+    emit: Optional[Emit] = None,
+    pinned_sections: Optional[List[Dict[str, Any]]] = None,
+    candidate_sections: Optional[List[Dict[str, Any]]] = None,
+) -> StageGraph:
+    """
+    Pipeline stages and their dependencies:
+
+        intent ───────────────────────────────────────────────────────────────────┐
+        language ─► normalized ─► embedding ─► retrieved ─► reranked ─► context ─► draft ─► validation
+                                                                   └► validation_context ─────┘
+                                                                                   draft ─► draft_local
+
+    Retrieval/rerank only need the normalized query, so they run speculatively
+    while the intent call is in flight; draft_local overlaps with validation.
+    The LLM stages see packed contexts (services/context.py): the most relevant
+    sentences of the reranked sections within a token budget each.
+    With `emit`, the draft is streamed from Groq and forwarded token by token.
+    With `pinned_sections` (an exact citation), retrieval/rerank are replaced
+    by those sections; intent still runs, so the query passes the same safety gate.
+    `candidate_sections` (an ambiguous citation) are added to the retrieved
+    sections and left to the reranker.
+    """
+    user_state = payload.user_state or "India"
+    graph = StageGraph()
+
+    graph.add("intent", partial(classify_intent, payload.query_text))
+    graph.add("language", partial(_resolve_language, payload))
+    graph.add(
+        "normalized",
+        lambda lang: translate_to_english(payload.query_text.strip(), lang),
+        "language",
+    )
+    graph.add("embedding", embed_query, "normalized")
+    def retrieve(query: str, embedding) -> List[Dict[str, Any]]:
+        sections = hybrid_retrieve(query, user_state, query_embedding=embedding)
+        if candidate_sections:
+            seen = {s["id"] for s in sections}
+            sections = [*sections, *(s for s in candidate_sections if s["id"] not in seen)]
+        return sections
+
+    graph.add("retrieved", retrieve, "normalized", "embedding")
+    graph.add(
+        "reranked",
+        lambda query, sections: rerank_sections(query, sections, top_k=CONTEXT_CANDIDATES),
+        "normalized",
+        "retrieved",
+    )
+    graph.add(
+        "context",
+        lambda query, sections, embedding: pack_context(query, sections, CONTEXT_TOKEN_BUDGET, embedding),
+        "normalized",
+        "reranked",
+        "embedding",
+    )
+    graph.add(
+        "validation_context",
+        lambda query, sections, embedding: pack_context(query, sections, VALIDATION_CONTEXT_TOKEN_BUDGET, embedding),
+        "normalized",
+        "reranked",
+        "embedding",
+    )
+
+    if pinned_sections is not None:
+        async def pinned():
+            return pinned_sections
+
+        graph.add("retrieved", pinned)
+        graph.add("reranked", pinned)
+
+    async def draft(query: str, sections: List[Dict[str, Any]]):
+        kwargs = dict(
+            query=query,
+            sections=sections,
+            explanation_mode=payload.explanation_mode,
+            state=user_state,
+            target_language="en",  # Always generate in English first for stability
+        )
+        if emit is None:
+            return await generate_answer(**kwargs)
+
+        parts = []
+        try:
+            async for token in generate_answer_stream(**kwargs):
+                parts.append(token)
+                emit("token", {"text": token})
+        except LLMStreamError:
+            # A truncated draft is never validated, cached or sent as final: llm_unavailable path
+            return None
+        return "".join(parts).strip() or None
+
+    async def validation(answer: str, sections: List[Dict[str, Any]], query: str, context: List[Dict[str, Any]]):
+        return await validate_grounding(
+            answer=answer,
+            sections=sections,
+            query=query,
+            sources=context,
+        )
+
+    graph.add("draft", draft, "normalized", "context")
+    graph.add("validation", validation, "draft", "validation_context", "normalized", "context")
+    graph.add("draft_local", _localize, "draft", "language")
+    return graph
+
+
+async def process_query(payload: QueryRequest, emit: Optional[Emit] = None) -> QueryResponse:
+    # 🔖 Exact citation ("Section 303 BNS", "धारा 302"): serve the section itself,
+    # and only involve the LLM when an explanation was actually asked for.
+    # A number several acts share only adds those sections as retrieval candidates.
+    citation = await asyncio.to_thread(match_citation, payload.query_text, payload.user_state or "India")
+    exact = citation is not None and not citation.ambiguous
+    if exact and not citation.wants_explanation and payload.explanation_mode != "eli15":
+        return await _citation_response(payload, citation, emit)
+
+    graph = _build_graph(
+        payload,
+        emit,
+        pinned_sections=citation.docs if exact else None,
+        candidate_sections=citation.docs if citation is not None and citation.ambiguous else None,
+    )
+    try:
+        return await _run_pipeline(graph, payload, emit)
+    finally:
+        # Drop any speculative work the response didn't need
+        graph.cancel_pending()
+
+
+async def stream_query(payload: QueryRequest) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run the pipeline and yield (event, data) pairs as results become available:
+    "intent", "sections", "token" (English draft chunks) and finally "final",
+    whose data is the same QueryResponse /answer would return, or "error"
+    (an api_overload QueryResponse) if the pipeline failed.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.ensure_future(
+        process_query(payload, emit=lambda event, data: queue.put_nowait((event, data)))
+    )
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            yield item
+        try:
+            yield "final", task.result().model_dump()
+        except Exception as e:
+            print(f"🚨 Streaming pipeline failed: {e}")
+            yield "error", _pipeline_error(payload).model_dump()
+    finally:
+        # Client went away mid-stream → stop the pipeline too
+        if not task.done():
+            task.cancel()
+
+
+def _pipeline_error(payload: QueryRequest) -> QueryResponse:
+    """Terminal response when the pipeline itself failed (same shape as the API_ERROR refusal)."""
+    msg_en = (
+        "I'm experiencing high traffic or connection issues with the AI service. "
+        "Please try again in a moment."
+    )
+    return QueryResponse(
+        status="refusal",
+        answer_primary=msg_en,
+        answer_english=msg_en,
+        confidence=0.0,
+        detected_language=payload.user_language or "en",
+        retrieved_sections=[],
+        error_type="api_overload",
+        high_risk=False,
+    )
+
+
+async def _citation_response(payload: QueryRequest, citation: CitationMatch, emit: Optional[Emit] = None) -> QueryResponse:
+    detected_lang = await asyncio.to_thread(_resolve_language, payload)
+    sections = _to_retrieved(citation.docs)
+    if emit:
+        emit("intent", {"intent": "LEGAL", "detected_language": detected_lang})
+        emit("sections", {"retrieved_sections": [s.model_dump() for s in sections]})
+
+    answer_en = "\n\n".join(f"{d['act']} — {d['section']}\n\n{d['text']}" for d in citation.docs)
+    return QueryResponse(
+        status="answer",
+        answer_primary=await _localize(answer_en, detected_lang),
+        answer_english=answer_en,
+        confidence=1.0,
+        detected_language=detected_lang,
+        retrieved_sections=sections,
+        error_type=None,
+        high_risk=False,
+    )
+
+
+async def _run_pipeline(graph: StageGraph, payload: QueryRequest, emit: Optional[Emit] = None) -> QueryResponse:
+    # Speculatively start retrieval + rerank alongside intent (most traffic is LEGAL)
+    graph.start("intent", "reranked")
+
+    # 🌟 Step 0: Dynamic Intent Classification (LLM)
+    intent = await graph.result("intent")
+    print(f"🧠 Detected Intent: {intent}")
+
+    # Determine desired language early (so GENERAL replies can be localized)
+    detected_lang = await graph.result("language")
+    if emit:
+        emit("intent", {"intent": intent, "detected_language": detected_lang})
+
+    if intent != "LEGAL":
+        graph.cancel("normalized", "embedding", "retrieved", "reranked")
 
     # ENFORCE ENGLISH GENERATION for RAG pipeline
     # We ALWAYS generate answer_en in English first
@@ -33,7 +292,7 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
             "I'm experiencing high traffic or connection issues with the AI service. "
             "Please try again in a moment."
         )
-        msg_local = translate_from_english(msg_en, detected_lang) if detected_lang != "en" else msg_en
+        msg_local = await _localize(msg_en, detected_lang)
         return QueryResponse(
             status="refusal",
             answer_primary=msg_local,
@@ -46,12 +305,9 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
         )
 
     if intent == "GENERAL":
-        reply_en = chat_general(payload.query_text) or "Hello! I am LawGuide AI."
+        reply_en = await chat_general(payload.query_text) or "Hello! I am LawGuide AI."
         # translate back to user's desired language if not English
-        if detected_lang != "en":
-            reply_local = translate_from_english(reply_en, detected_lang)
-        else:
-            reply_local = reply_en
+        reply_local = await _localize(reply_en, detected_lang)
 
         return QueryResponse(
             status="answer",
@@ -66,7 +322,7 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
 
     if intent == "OFF_TOPIC":
         msg_en = "I am a legal assistant and can only help with Indian laws, rights, and legal procedures."
-        msg_local = translate_from_english(msg_en, detected_lang) if detected_lang != "en" else msg_en
+        msg_local = await _localize(msg_en, detected_lang)
         return QueryResponse(
             status="refusal",
             answer_primary=msg_local,
@@ -80,7 +336,7 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
 
     if intent == "ILLEGAL":
         msg_en = "I cannot help with illegal activities. If you need legal consequences or support for a lawful situation, I can assist."
-        msg_local = translate_from_english(msg_en, detected_lang) if detected_lang != "en" else msg_en
+        msg_local = await _localize(msg_en, detected_lang)
         return QueryResponse(
             status="refusal",
             answer_primary=msg_local,
@@ -94,13 +350,13 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
 
     # If intent is LEGAL (or fallback), proceed to RAG pipeline...
     # detected_lang already set above; keep using it
-    normalized_query = translate_to_english(payload.query_text.strip(), detected_lang)
+    normalized_query = await graph.result("normalized")
     if not normalized_query:
         safe_msg_en = (
             "I'm unable to process your question due to language handling issues. "
             "Please try again in simple English or consult a legal expert."
         )
-        safe_local = translate_from_english(safe_msg_en, detected_lang)
+        safe_local = await _localize(safe_msg_en, detected_lang)
         return QueryResponse(
             status="refusal",
             answer_primary=safe_local,
@@ -112,16 +368,32 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
             high_risk=False,
         )
 
-    user_state = payload.user_state or "India"
+    # ♻ Semantic answer cache: near-identical question already answered & validated
+    query_embedding, index_version = None, ""
+    if answer_cache is not None:
+        query_embedding = await graph.result("embedding")
+        index_version = await asyncio.to_thread(index_fingerprint)
+        cached = await asyncio.to_thread(
+            answer_cache.lookup, query_embedding, payload.user_state or "India", payload.explanation_mode, index_version
+        )
+        if cached:
+            graph.cancel("retrieved", "reranked")
+            if emit:
+                emit("sections", {"retrieved_sections": cached["retrieved_sections"]})
+            return QueryResponse(
+                **cached,
+                answer_primary=await _localize(cached["answer_english"], detected_lang),
+                detected_language=detected_lang,
+            )
 
     # Retrieve related legal sections
-    retrieved = retrieve_sections(normalized_query, user_state)
+    retrieved = await graph.result("retrieved")
     if not retrieved:
         safe_msg_en = (
             "I couldn't find relevant legal sections in the current dataset for your question. "
             "Please consult a qualified legal expert or legal aid service."
         )
-        safe_local = translate_from_english(safe_msg_en, detected_lang)
+        safe_local = await _localize(safe_msg_en, detected_lang)
         return QueryResponse(
             status="refusal",
             answer_primary=safe_local,
@@ -133,17 +405,16 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
             high_risk=False,
         )
 
-    # Rank sections using cross encoder
-    reranked = rerank_sections(normalized_query, retrieved)
+    # Rank sections using cross encoder; the token budget decides how many reach the prompt
+    reranked = await graph.result("reranked")
+    sources = _in_context(reranked, await graph.result("context")) or reranked
+    if emit:
+        emit("sections", {"retrieved_sections": [s.model_dump() for s in _to_retrieved(sources)]})
 
-    # Generate primary answer (always in English for grounding/stability)
-    draft_answer_en = generate_answer(
-        query=normalized_query,
-        sections=reranked[:5],  # Limit to top 5 to prevent 413 Payload Too Large
-        explanation_mode=payload.explanation_mode,
-        state=user_state,
-        target_language="en", # Always generate in English first for stability
-    )
+    # Generate primary answer (always in English for grounding/stability);
+    # the validator's context is packed while the draft is being written
+    graph.start("validation_context")
+    draft_answer_en = await graph.result("draft")
 
     if not draft_answer_en:
         explanation = (
@@ -156,23 +427,16 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
             answer_english=explanation,
             confidence=0.4,
             detected_language=detected_lang,
-            retrieved_sections=[RetrievedSection(**{
-                "act": s["act"],
-                "section": s["section"],
-                "text": s["text"],
-                "jurisdiction": s["jurisdiction"],
-                "source_link": s.get("source_link", "")
-            }) for s in reranked],
+            retrieved_sections=_to_retrieved(sources),
             error_type="llm_unavailable",
             high_risk=False,
         )
 
+    # Translate the draft while validation runs; discarded if validation refuses
+    graph.start("draft_local")
+
     # Validation phase
-    validation_result: ValidationResult = validate_answer(
-        answer=draft_answer_en,
-        sections=reranked,
-        query=normalized_query,
-    )
+    validation_result: ValidationResult = await graph.result("validation")
 
     confidence = max(0.0, min(validation_result.confidence, 1.0))
 
@@ -182,6 +446,7 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
 
     # 🚨 High-risk handling
     if validation_result.high_risk:
+        graph.cancel("draft_local")
         safe_en = (
             "Your question may involve serious harm, instructions to commit an illegal act, or suicide-related content. "
             "For safety reasons, I cannot provide guidance.\n\n"
@@ -190,7 +455,7 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
             "\n• Contact local authorities"
             "\n\nIf your question is about legal consequences of an incident that already occurred (not future intent), please rephrase clearly."
         )
-        safe_local = translate_from_english(safe_en, detected_lang)
+        safe_local = await _localize(safe_en, detected_lang)
         return QueryResponse(
             status="refusal",
             answer_primary=safe_local,
@@ -214,11 +479,12 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
     print(f"DEBUG VALIDATION: Valid={validation_result.is_valid}, Conf={confidence}, Game={is_game_intent}, Proc={is_procedural_intent}, Rights={is_rights_intent}, Legal={is_legality_intent}")
 
     if not is_game_intent and not is_procedural_intent and not is_rights_intent and not is_legality_intent and not validation_result.is_valid and confidence < 0.4:
+        graph.cancel("draft_local")
         safe_en = (
             "I'm unable to provide a fully reliable legal interpretation based on the available information. "
             "Please consult a qualified legal expert."
         )
-        safe_local = translate_from_english(safe_en, detected_lang)
+        safe_local = await _localize(safe_en, detected_lang)
         return QueryResponse(
             status="refusal",
             answer_primary=safe_local,
@@ -233,43 +499,40 @@ async def process_query(payload: QueryRequest) -> QueryResponse:
     # ⚠ Medium confidence
     if confidence < CONFIDENCE_THRESHOLD:
         disclaimer = (
-            "\n\n⚠ NOTE: This explanation is based only on available legal sections and may not reflect recent updates or state variations. "
+            "⚠ NOTE: This explanation is based only on available legal sections and may not reflect recent updates or state variations. "
             "Consult a licensed lawyer before making decisions."
         )
-        enriched_en = draft_answer_en + disclaimer
-        enriched_local = translate_from_english(enriched_en, detected_lang)
-        return QueryResponse(
+        enriched_en = draft_answer_en + "\n\n" + disclaimer
+        # Draft is already translating; only the disclaimer is new work
+        draft_local, disclaimer_local = await asyncio.gather(
+            graph.result("draft_local"),
+            _localize(disclaimer, detected_lang),
+        )
+        enriched_local = draft_local + "\n\n" + disclaimer_local
+        response = QueryResponse(
             status="answer",
             answer_primary=enriched_local,
             answer_english=enriched_en,
             confidence=max(confidence, 0.5),
             detected_language=detected_lang,
-            retrieved_sections=[RetrievedSection(**{
-                "act": s["act"],
-                "section": s["section"],
-                "text": s["text"],
-                "jurisdiction": s["jurisdiction"],
-                "source_link": s.get("source_link", "")
-            }) for s in reranked],
+            retrieved_sections=_to_retrieved(sources),
             error_type="medium_confidence",
             high_risk=False,
         )
+        await asyncio.to_thread(_remember, payload, query_embedding, index_version, response)
+        return response
 
     # 🟢 High confidence answer
-    final_local = translate_from_english(draft_answer_en, detected_lang)
-    return QueryResponse(
+    final_local = await graph.result("draft_local")
+    response = QueryResponse(
         status="answer",
         answer_primary=final_local,
         answer_english=draft_answer_en,
         confidence=confidence,
         detected_language=detected_lang,
-        retrieved_sections=[RetrievedSection(**{
-            "act": s["act"],
-            "section": s["section"],
-            "text": s["text"],
-            "jurisdiction": s["jurisdiction"],
-            "source_link": s.get("source_link", "")
-        }) for s in reranked],
+        retrieved_sections=_to_retrieved(sources),
         error_type=None,
         high_risk=False,
     )
+    await asyncio.to_thread(_remember, payload, query_embedding, index_version, response)
+    return response
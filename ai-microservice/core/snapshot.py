@@ -0,0 +1,144 @@
+# core/snapshot.py
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SNAPSHOT_FORMAT_VERSION = 1
+SECTIONS_FILE = "sections.jsonl"
+EMBEDDINGS_FILE = "embeddings.npy"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@dataclass
+class Snapshot:
+    """
+    A portable index snapshot directory:
+
+        sections.jsonl   one section dict per line (row i ↔ embeddings[i])
+        embeddings.npy   contiguous (count, dim) float32/float16 matrix, memory-mapped
+        manifest.json    format/snapshot version, model, dim, dtype, count, sha256 per file
+    """
+
+    path: str
+    manifest: Dict[str, Any]
+    embeddings: np.ndarray
+
+    @property
+    def model(self) -> str:
+        return self.manifest["model"]
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
+    def iter_sections(self) -> Iterator[Dict[str, Any]]:
+        with open(os.path.join(self.path, SECTIONS_FILE), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def sections(self) -> List[Dict[str, Any]]:
+        return list(self.iter_sections())
+
+
+def write_snapshot(
+    out_dir: str,
+    rows: Iterable[Tuple[Dict[str, Any], Sequence[float]]],
+    count: int,
+    dim: int,
+    model: str,
+    dtype: str = "float32",
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Write (section dict, embedding) rows as a snapshot. Embeddings go straight into
+    a pre-sized .npy memmap, so memory stays bounded by one row. Returns the manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    sections_path = os.path.join(out_dir, SECTIONS_FILE)
+    embeddings_path = os.path.join(out_dir, EMBEDDINGS_FILE)
+
+    matrix = np.lib.format.open_memmap(embeddings_path, mode="w+", dtype=np.dtype(dtype), shape=(count, dim))
+    written = 0
+    with open(sections_path, "w", encoding="utf-8") as f:
+        for section, embedding in rows:
+            if written >= count:
+                raise ValueError(f"More rows than the declared count ({count})")
+            matrix[written] = np.asarray(embedding, dtype=np.float32)
+            f.write(json.dumps(section, ensure_ascii=False) + "\n")
+            written += 1
+    matrix.flush()
+    del matrix
+    if written != count:
+        raise ValueError(f"Snapshot declared {count} rows but got {written}")
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "snapshot_version": time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()),
+        "model": model,
+        "dim": dim,
+        "dtype": dtype,
+        "count": count,
+        "files": {
+            name: {"sha256": file_sha256(os.path.join(out_dir, name)), "bytes": os.path.getsize(os.path.join(out_dir, name))}
+            for name in (SECTIONS_FILE, EMBEDDINGS_FILE)
+        },
+        **(extra or {}),
+    }
+    # Manifest last: a snapshot without one is incomplete
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def verify_snapshot(path: str) -> List[str]:
+    """Problems found (missing files, checksum mismatches); empty if the snapshot is intact."""
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return [f"missing {MANIFEST_FILE}"]
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    problems = []
+    for name, info in manifest.get("files", {}).items():
+        file_path = os.path.join(path, name)
+        if not os.path.exists(file_path):
+            problems.append(f"missing {name}")
+        elif file_sha256(file_path) != info["sha256"]:
+            problems.append(f"checksum mismatch: {name}")
+    return problems
+
+
+def load_snapshot(path: str, mmap: bool = True, verify: bool = False, expected_model: Optional[str] = None) -> Snapshot:
+    """
+    Open a snapshot; embeddings are memory-mapped (no copy, pages load on demand).
+    Raises ValueError for an incompatible or (with `verify`) corrupted snapshot.
+    """
+    if verify:
+        problems = verify_snapshot(path)
+        if problems:
+            raise ValueError(f"Snapshot {path} failed verification: {', '.join(problems)}")
+
+    with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format {manifest.get('format_version')}")
+    if expected_model and manifest["model"] != expected_model:
+        raise ValueError(f"Snapshot embeddings are from {manifest['model']}, expected {expected_model}")
+
+    embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r" if mmap else None)
+    if embeddings.shape != (manifest["count"], manifest["dim"]):
+        raise ValueError(f"Embeddings shape {embeddings.shape} does not match manifest")
+    return Snapshot(path=path, manifest=manifest, embeddings=embeddings)
@@ -20,4 +20,5 @@ class SectionSearchRequest(BaseModel):
     query_text: str
     user_state: Optional[str] = None
     user_language: Optional[str] = None
-    top_k: int = 20  # how many sections to return
\ No newline at end of file
+    top_k: int = 20  # how many sections to return
+    lazy_translation: bool = False  # return English now + translation_id handles to fetch later
\ No newline at end of file
@@ -28,9 +28,17 @@ class SectionSearchResult(BaseModel):
     text_english: str       # original English law
     jurisdiction: str
     source_link: Optional[str] = None
+    translation_id: Optional[str] = None  # set in lazy mode while text_primary is still English
 
 
 class SectionSearchResponse(BaseModel):
     detected_language: str
     query_text: str
-    results: List[SectionSearchResult] = Field(default_factory=list)
\ No newline at end of file
+    results: List[SectionSearchResult] = Field(default_factory=list)
+
+
+# 🆕 New: lazily fetched section translation (law browser lazy mode)
+class TranslationResult(BaseModel):
+    translation_id: str
+    status: str  # "done", "pending" or "unknown"
+    text: Optional[str] = None
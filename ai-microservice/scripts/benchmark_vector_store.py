@@ -0,0 +1,80 @@
+import argparse
+import logging
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from core.metrics import LatencyTracker
+from scripts.export_onnx import SAMPLE_QUERIES
+from services.embeddings import get_embedding_model
+from services.vector_store import ChromaVectorStore, NumpyVectorStore
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+
+def recall_at_k(found: List[str], exact: List[str], k: int) -> float:
+    """Share of the exact top-k that the approximate search also returned."""
+    if not exact:
+        return 1.0
+    return len(set(found[:k]) & set(exact[:k])) / float(min(k, len(exact)))
+
+
+# ================= BENCHMARK =================
+def benchmark(snapshot_dir: str, states: List[Optional[str]], k: int, rounds: int) -> float:
+    t0 = time.perf_counter()
+    chroma = ChromaVectorStore()
+    chroma_open_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    numpy_store = NumpyVectorStore(snapshot_dir)
+    numpy_open_ms = (time.perf_counter() - t0) * 1000
+    logging.info(
+        f"📂 Opened chroma ({chroma.count()} vectors) in {chroma_open_ms:.0f} ms | "
+        f"numpy ({numpy_store.count()} vectors, {numpy_store.embeddings.dtype}) in {numpy_open_ms:.0f} ms"
+    )
+    if chroma.count() != numpy_store.count():
+        logging.warning("⚠ Chroma and the snapshot hold different vector counts — recall numbers are approximate.")
+
+    queries = np.asarray(get_embedding_model().encode(SAMPLE_QUERIES), dtype=np.float32)
+    tracker = LatencyTracker(window=len(queries) * len(states) * rounds)
+
+    # One untimed pass per store: first queries pay for page faults / HNSW loading
+    for store in (chroma, numpy_store):
+        store.search(queries[0], k, states[0])
+
+    recalls = []
+    for _ in range(rounds):
+        for state in states:
+            for query in queries:
+                with tracker.time("chroma"):
+                    approx = chroma.search(query, k, state)
+                with tracker.time("numpy"):
+                    exact = numpy_store.search(query, k, state)
+                recalls.append(recall_at_k([d["id"] for d in approx], [d["id"] for d in exact], k))
+
+    for name, s in tracker.stats.items():
+        logging.info(f"⏱ {name:>6}: mean {s['mean_ms']} ms | p50 {s['p50_ms']} ms | p95 {s['p95_ms']} ms ({s['count']} queries)")
+    recall = float(np.mean(recalls))
+    logging.info(f"🎯 Chroma recall@{k} vs exact search: {recall:.3f}")
+    return recall
+
+
+# ================= MAIN =================
+def main():
+    parser = argparse.ArgumentParser(description="Compare Chroma (HNSW) and NumPy (exact, mmap) vector stores")
+    parser.add_argument("snapshot", help="Snapshot directory (python -m scripts.snapshot export)")
+    parser.add_argument("--states", default=",Karnataka,Maharashtra", help="Comma-separated state filters ('' = no filter)")
+    parser.add_argument("--k", type=int, default=20, help="Results per query")
+    parser.add_argument("--rounds", type=int, default=5, help="Passes over the sample queries")
+    parser.add_argument("--min-recall", type=float, default=0.0, help="Exit non-zero if Chroma recall@k falls below this")
+    args = parser.parse_args()
+
+    states = [s.strip() or None for s in args.states.split(",")]
+    if benchmark(args.snapshot, states, args.k, args.rounds) < args.min_recall:
+        logging.error("❌ Chroma recall below --min-recall")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
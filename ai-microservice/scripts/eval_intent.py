@@ -0,0 +1,104 @@
+import argparse
+import logging
+import sys
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from config import INTENT_EXAMPLES_PATH, INTENT_KNN_K, INTENT_CONFIDENCE_THRESHOLD, INTENT_MIN_SIMILARITY
+from core.metrics import LatencyTracker
+from services.embeddings import get_embedding_model
+from services.intent import INTENT_LABELS, IntentClassifier, encode_texts, load_examples
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+
+def stratified_folds(labels, folds, seed):
+    """Fold index per example, with every label spread evenly over the folds."""
+    rng = np.random.default_rng(seed)
+    assignment = np.zeros(len(labels), dtype=int)
+    by_label = defaultdict(list)
+    for i, label in enumerate(labels):
+        by_label[label].append(i)
+    for members in by_label.values():
+        rng.shuffle(members)
+        for n, i in enumerate(members):
+            assignment[i] = n % folds
+    return assignment
+
+
+# ================= EVALUATION =================
+def evaluate(path, folds, k, threshold, min_similarity, seed):
+    rows = load_examples(path)
+    texts = [r["text"] for r in rows]
+    labels = [r["label"] for r in rows]
+    logging.info(f"📚 {len(rows)} examples: {dict(Counter(labels))}")
+
+    vectors = encode_texts(texts)
+    assignment = stratified_folds(labels, folds, seed)
+    tracker = LatencyTracker(window=len(rows))
+    model = get_embedding_model()
+
+    predictions = [None] * len(rows)
+    for fold in range(folds):
+        train = np.flatnonzero(assignment != fold)
+        clf = IntentClassifier(
+            [texts[i] for i in train], [labels[i] for i in train], vectors[train],
+            k=k, threshold=threshold, min_similarity=min_similarity,
+        )
+        for i in np.flatnonzero(assignment == fold):
+            # Timed as in serving: embed the query (uncached), then the kNN vote
+            t0 = time.perf_counter()
+            query_vec = np.asarray(model.encode([texts[i]]), dtype=np.float32)[0]
+            t1 = time.perf_counter()
+            predictions[i] = clf.predict(query_vec)
+            t2 = time.perf_counter()
+            tracker.record("embed", (t1 - t0) * 1000)
+            tracker.record("knn", (t2 - t1) * 1000)
+            tracker.record("total", (t2 - t0) * 1000)
+
+    correct = [p.label == y for p, y in zip(predictions, labels)]
+    confident = [p.confident for p in predictions]
+    kept = [c for c, keep in zip(correct, confident) if keep]
+    logging.info(f"🎯 Accuracy (all, top label): {np.mean(correct):.3f}")
+    logging.info(
+        f"🎯 Answered locally: {np.mean(confident):.1%} | accuracy there: "
+        f"{(np.mean(kept) if kept else 0.0):.3f} | deferred to LLM: {len(rows) - len(kept)}"
+    )
+    for label in INTENT_LABELS:
+        idx = [i for i, y in enumerate(labels) if y == label]
+        if idx:
+            logging.info(
+                f"   {label:<9} accuracy {np.mean([correct[i] for i in idx]):.3f} "
+                f"({sum(confident[i] for i in idx)}/{len(idx)} local)"
+            )
+
+    confusion = Counter((y, p.label) for p, y in zip(predictions, labels) if p.label != y)
+    for (truth, predicted), n in confusion.most_common(10):
+        logging.info(f"   ✗ {truth} → {predicted}: {n}")
+    for name, s in tracker.stats.items():
+        logging.info(f"⏱ {name:>5}: mean {s['mean_ms']} ms | p50 {s['p50_ms']} ms | p95 {s['p95_ms']} ms")
+    return float(np.mean(kept)) if kept else 0.0
+
+
+# ================= MAIN =================
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validated accuracy + latency of the on-box intent classifier")
+    parser.add_argument("--examples", default=INTENT_EXAMPLES_PATH)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--k", type=int, default=INTENT_KNN_K)
+    parser.add_argument("--threshold", type=float, default=INTENT_CONFIDENCE_THRESHOLD)
+    parser.add_argument("--min-similarity", type=float, default=INTENT_MIN_SIMILARITY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-accuracy", type=float, default=0.0, help="Exit non-zero if local accuracy falls below this")
+    args = parser.parse_args()
+
+    accuracy = evaluate(args.examples, args.folds, args.k, args.threshold, args.min_similarity, args.seed)
+    if accuracy < args.min_accuracy:
+        logging.error("❌ Local intent accuracy below --min-accuracy")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
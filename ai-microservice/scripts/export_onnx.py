@@ -0,0 +1,141 @@
+import argparse
+import logging
+import sys
+import time
+from typing import List
+
+import numpy as np
+from sentence_transformers import SentenceTransformer, CrossEncoder
+
+from config import EMBEDDING_MODEL_NAME, RERANKER_MODEL_NAME, RERANKER_MAX_LENGTH
+from services.inference import (
+    OnnxCrossEncoder,
+    OnnxSentenceEncoder,
+    export_onnx_models,
+    onnx_paths,
+)
+from services.vector_store import index_collections, open_chroma_client
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+SAMPLE_QUERIES = [
+    "what is the punishment for theft",
+    "how to file an FIR",
+    "punishment for murder",
+    "rights of an arrested person",
+    "bail for non-bailable offence",
+    "dowry death punishment",
+    "cheating and dishonestly inducing delivery of property",
+    "defamation law in India",
+    "sexual harassment at workplace",
+    "punishment for drunk driving",
+    "domestic violence complaint",
+    "police refusing to register complaint",
+]
+
+
+def load_corpus_sample(limit: int) -> List[str]:
+    """Up to `limit` indexed documents, spread over the state partitions (or the legacy collection)."""
+    # Smallest first, so partitions with fewer rows than their share leave the rest to larger ones
+    collections = sorted(index_collections(open_chroma_client()), key=lambda c: c.count())
+    docs = []
+    for i, collection in enumerate(collections):
+        share = -(-(limit - len(docs)) // (len(collections) - i))
+        if share > 0:
+            docs.extend(d for d in collection.get(limit=share, include=["documents"])["documents"] if d)
+    return docs[:limit]
+
+
+def overlap_at_k(a: np.ndarray, b: np.ndarray, k: int) -> float:
+    return len(set(a[:k].tolist()) & set(b[:k].tolist())) / float(k)
+
+
+# ================= PARITY CHECK =================
+def check_parity(quantized: bool, corpus_limit: int, k: int, min_overlap: float) -> bool:
+    corpus = load_corpus_sample(corpus_limit)
+    if len(corpus) < k:
+        logging.error(f"❌ Need at least {k} indexed documents for the parity check, found {len(corpus)}.")
+        return False
+
+    # ---- Embeddings: does ONNX retrieve the same top-k as PyTorch? ----
+    torch_encoder = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+    onnx_encoder = OnnxSentenceEncoder(*onnx_paths(EMBEDDING_MODEL_NAME, quantized))
+
+    t0 = time.perf_counter()
+    torch_docs = np.asarray(torch_encoder.encode(corpus, batch_size=32, normalize_embeddings=True))
+    torch_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    onnx_docs = onnx_encoder.encode(corpus, batch_size=32)
+    onnx_ms = (time.perf_counter() - t0) * 1000
+    logging.info(f"⏱ Corpus encode ({len(corpus)} docs): torch {torch_ms:.0f} ms | onnx {onnx_ms:.0f} ms")
+
+    torch_q = np.asarray(torch_encoder.encode(SAMPLE_QUERIES, normalize_embeddings=True))
+    onnx_q = onnx_encoder.encode(SAMPLE_QUERIES)
+    cosine = float(np.mean(np.sum(torch_q * onnx_q, axis=1)))
+
+    retrieval_overlap, top1_agree = [], 0
+    candidates = []
+    for i in range(len(SAMPLE_QUERIES)):
+        torch_rank = np.argsort(-(torch_docs @ torch_q[i]))
+        onnx_rank = np.argsort(-(onnx_docs @ onnx_q[i]))
+        retrieval_overlap.append(overlap_at_k(torch_rank, onnx_rank, k))
+        top1_agree += int(torch_rank[0] == onnx_rank[0])
+        candidates.append(torch_rank[:k])
+
+    logging.info(
+        f"📐 Embeddings: mean query cosine(torch, onnx)={cosine:.4f}, "
+        f"overlap@{k}={np.mean(retrieval_overlap):.3f}, top-1 agreement={top1_agree}/{len(SAMPLE_QUERIES)}"
+    )
+
+    # ---- Reranker: same ordering of each query's candidates? ----
+    torch_ce = CrossEncoder(RERANKER_MODEL_NAME, max_length=RERANKER_MAX_LENGTH, device="cpu")
+    onnx_ce = OnnxCrossEncoder(*onnx_paths(RERANKER_MODEL_NAME, quantized))
+
+    rerank_overlap, torch_ms, onnx_ms = [], 0.0, 0.0
+    for query, cand in zip(SAMPLE_QUERIES, candidates):
+        pairs = [(query, corpus[j]) for j in cand]
+        t0 = time.perf_counter()
+        torch_scores = np.asarray(torch_ce.predict(pairs, batch_size=32))
+        torch_ms += (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        onnx_scores = onnx_ce.predict(pairs, batch_size=32)
+        onnx_ms += (time.perf_counter() - t0) * 1000
+        top = max(1, k // 2)
+        rerank_overlap.append(overlap_at_k(np.argsort(-torch_scores), np.argsort(-onnx_scores), top))
+
+    logging.info(
+        f"📊 Reranker: overlap@{max(1, k // 2)}={np.mean(rerank_overlap):.3f} | "
+        f"torch {torch_ms / len(SAMPLE_QUERIES):.0f} ms/query, onnx {onnx_ms / len(SAMPLE_QUERIES):.0f} ms/query"
+    )
+
+    return min(np.mean(retrieval_overlap), np.mean(rerank_overlap)) >= min_overlap
+
+
+# ================= MAIN =================
+def main():
+    parser = argparse.ArgumentParser(description="Export embeddings + reranker to ONNX and verify ranking parity")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip dynamic int8 quantization")
+    parser.add_argument("--skip-export", action="store_true", help="Only run the parity check on existing models")
+    parser.add_argument("--skip-parity", action="store_true", help="Only export")
+    parser.add_argument("--corpus-limit", type=int, default=2000, help="Indexed documents used for the parity check")
+    parser.add_argument("--k", type=int, default=10, help="Ranking depth compared")
+    parser.add_argument("--min-overlap", type=float, default=0.9, help="Fail below this mean overlap@k")
+    args = parser.parse_args()
+
+    quantized = not args.no_quantize
+    if not args.skip_export:
+        for path in export_onnx_models(quantize=quantized):
+            logging.info(f"💾 Wrote {path}")
+
+    if args.skip_parity:
+        return
+
+    if check_parity(quantized, args.corpus_limit, args.k, args.min_overlap):
+        logging.info("✅ ONNX ranking parity OK — safe to set INFERENCE_BACKEND=onnx")
+    else:
+        logging.error("❌ ONNX ranking diverges from PyTorch beyond --min-overlap; keep INFERENCE_BACKEND=torch")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
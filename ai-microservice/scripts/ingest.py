@@ -2,15 +2,23 @@ import os
 import json   # 🆕 REQUIRED FOR EXPORT
 import re
 import argparse
+import hashlib
 import logging
-import uuid
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
 
-from config import EMBEDDING_MODEL_NAME, CHROMA_DB_DIR
+from config import EMBEDDING_MODEL_NAME, CHROMA_DB_DIR, BM25_INDEX_DIR, CHUNK_MAX_WORDS, CHUNK_OVERLAP_WORDS
+from core.bm25 import BM25Index
+from core.chunking import body_sections, segment_sections, split_passages, strip_markdown
+from services.vector_store import (
+    COLLECTION_NAME,
+    index_collections,
+    list_partitions,
+    open_chroma_client,
+    partition_name,
+)
 
 # Optional dependencies
 try:
@@ -26,64 +34,136 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 
-# ================= Helper =================
-def make_unique_id(prefix: str) -> str:
-    """Generate a unique ID based on prefix and uuid4."""
-    return f"{prefix}_{uuid.uuid4().hex}"
+MANIFEST_PATH = os.path.join(CHROMA_DB_DIR, "ingest_manifest.json")
+CHECKPOINT_PATH = os.path.join(CHROMA_DB_DIR, "ingest_checkpoint.json")
+SEEN_LOG_PATH = os.path.join(CHROMA_DB_DIR, "ingest_seen.txt")
+METADATA_KEYS = [
+    "act", "section", "jurisdiction", "state", "source_link",
+    "page_start", "page_end", "act_number", "parent_id", "chunk_index", "chunk_count", "source",
+]
 
 
-def make_doc(doc_id: str, act: str, section: str, text: str,
-             jurisdiction="central", state="India", source_link=""):
+# ================= Helper =================
+def make_doc_id(act: str, section: str, text: str, state: str = "India") -> str:
+    """
+    Deterministic ID: readable act/section prefix + hash of (act, section, state,
+    whitespace-normalized text). Same content → same ID on every run; any text
+    change → new ID, so changed sections are re-embedded and the old vector removed.
+    """
+    normalized = " ".join(text.split())
+    digest = hashlib.sha256("\x1f".join([act, section, state or "", normalized]).encode("utf-8")).hexdigest()
+    prefix = re.sub(r"[^a-z0-9]+", "_", f"{act} {section}".lower()).strip("_")[:60]
+    return f"{prefix}_{digest[:20]}"
+
+
+def make_parent_id(act: str, state: str = "India") -> str:
+    """Stable ID of the parent act, shared by all of its section/passage chunks."""
+    return hashlib.sha256(f"{act}\x1f{state or ''}".encode("utf-8")).hexdigest()[:16]
+
+
+def make_doc(act: str, section: str, text: str,
+             jurisdiction="central", state="India", source_link="", source="", **extra):
+    text = text.strip()
     return {
-        "id": doc_id,
+        "id": make_doc_id(act, section, text, state),
         "act": act,
         "section": section,
-        "text": text.strip(),
+        "text": text,
         "jurisdiction": jurisdiction,
         "state": state,
         "source_link": source_link,
+        "source": source,  # which input produced it, e.g. "pdf:BNS_2023.pdf" / "hf:central"
+        **extra,
     }
 
 
+def chunk_docs(act: str, section: str, text: str, jurisdiction="central", state="India",
+               source_link="", source="", **extra):
+    """
+    Docs for one section: a single doc if it fits CHUNK_MAX_WORDS, otherwise
+    overlapping passages. All carry parent_id / chunk_index / chunk_count.
+    """
+    passages = split_passages(text, CHUNK_MAX_WORDS, CHUNK_OVERLAP_WORDS)
+    return [
+        make_doc(
+            act, section, passage, jurisdiction, state, source_link, source,
+            parent_id=make_parent_id(act, state),
+            chunk_index=i,
+            chunk_count=len(passages),
+            **extra,
+        )
+        for i, passage in enumerate(passages)
+    ]
+
+
 # ===== PDF Extraction =====
-def extract_pdf_sections(pdf_path, act_name, jurisdiction, state):
+_worker_reader = None
+
+
+def _init_pdf_worker(pdf_path):
+    global _worker_reader
+    _worker_reader = PdfReader(pdf_path)
+
+
+def _extract_page_text(page_index):
+    """(page index, text or None, error) — runs in a pool worker."""
+    try:
+        return page_index, _worker_reader.pages[page_index].extract_text() or "", None
+    except Exception as e:
+        return page_index, None, str(e)
+
+
+def iter_pdf_pages(pdf_path, workers=None):
+    """Yield (page number, text) in order; page text is extracted in a process pool."""
+    reader = PdfReader(pdf_path)
+    n_pages = len(reader.pages)
+    workers = min(workers or os.cpu_count() or 1, n_pages)
+
+    if workers <= 1:
+        _init_pdf_worker(pdf_path)
+        results = map(_extract_page_text, range(n_pages))
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker, initargs=(pdf_path,))
+        results = pool.map(_extract_page_text, range(n_pages), chunksize=max(1, n_pages // (workers * 4)))
+
+    try:
+        for page_index, text, error in results:
+            if error is not None:
+                logging.warning(f"⚠ {os.path.basename(pdf_path)} page {page_index + 1}: text extraction failed ({error})")
+                continue
+            yield page_index + 1, text
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def extract_pdf_sections(pdf_path, act_name, jurisdiction, state, workers=None):
     if not PdfReader:
         logging.warning("pypdf not installed. Skipping PDF extraction.")
         return []
 
     try:
-        reader = PdfReader(pdf_path)
+        pages = iter_pdf_pages(pdf_path, workers)
+        docs = []
+        for sec in body_sections(segment_sections(pages)):
+            docs.extend(chunk_docs(
+                act_name, f"Section {sec['number']}", sec["text"], jurisdiction, state,
+                source=f"pdf:{os.path.basename(pdf_path)}",
+                page_start=sec["page_start"],
+                page_end=sec["page_end"],
+            ))
     except Exception as e:
         logging.error(f"❌ Failed to load {pdf_path}: {e}")
         return []
 
-    full_text = ""
-    for page in reader.pages:
-        try:
-            full_text += page.extract_text() + "\n"
-        except:
-            continue
-
-    sections = re.findall(
-        r"(?:Section\s*)?(\d+[A-Z]?)[\.\-:\)]\s*(.*?)(?=(?:Section\s*\d+[A-Z]?|^\d+[A-Z]?[\.\-:\)]|\Z))",
-        full_text,
-        flags=re.DOTALL | re.MULTILINE
-    )
-    logging.info(f"📝 Extracted {len(sections)} sections from {act_name}")
-
-    docs = []
-    for sec_num, sec_text in sections:
-        section_name = f"Section {sec_num}"
-        doc_id = make_unique_id(act_name.replace(" ", "_").lower())
-        docs.append(make_doc(doc_id, act_name, section_name, sec_text, jurisdiction, state))
-
+    logging.info(f"📝 Extracted {len({d['section'] for d in docs})} sections ({len(docs)} chunks) from {act_name}")
     return docs
 
 
-def load_manual_pdfs(base_dir):
+def iter_manual_pdfs(base_dir, workers=None):
     logging.info("📥 Loading BNS & BNSS PDFs")
     data_dir = os.path.join(base_dir, "data")
-    docs = []
 
     pdf_files = [
         ("BNS_2023.pdf", "Bharatiya Nyaya Sanhita 2023"),
@@ -93,79 +173,428 @@ def load_manual_pdfs(base_dir):
     for filename, act_name in pdf_files:
         path = os.path.join(data_dir, filename)
         if os.path.exists(path):
-            docs.extend(extract_pdf_sections(path, act_name, "central", "India"))
+            yield from extract_pdf_sections(path, act_name, "central", "India", workers)
         else:
             logging.warning(f"⚠ Missing PDF: {filename}")
 
+
+# ===== Hugging Face Dataset Ingestion (streamed) =====
+HF_DATASET = "geekyrakshit/Indian-Legal-Acts"
+
+
+def act_row_docs(row, split, i):
+    """Chunk docs for one dataset row (one act)."""
+    act = row.get("Short Title") or "Unknown Act"
+    section = row.get("Act Number") or f"Act_{i}"
+    text = row.get("Markdown") or ""
+    source_link = row.get("View") or ""
+    entity = row.get("Entity") or "central"
+
+    if not text.strip():
+        return []
+
+    common = dict(
+        jurisdiction="central" if entity.lower() == "central" else "state",
+        state=entity.replace("_", " ").title(),
+        source_link=source_link,
+        source=f"hf:{split}",
+        act_number=str(section),
+    )
+
+    # Split the act into its sections; acts without recognisable
+    # numbering become bounded passages of the whole body
+    body = strip_markdown(text)
+    sections = body_sections(segment_sections([(1, body)]))
+    if len(sections) < 2:
+        return chunk_docs(act, str(section), body, **common)
+    docs = []
+    for sec in sections:
+        docs.extend(chunk_docs(act, f"Section {sec['number']}", sec["text"], **common))
     return docs
 
 
-# ===== Hugging Face Dataset Ingestion =====
-def load_huggingface_acts(include_states=True):
+def iter_huggingface_acts(include_states=True, positions=None):
+    """
+    Stream acts from the dataset (no full download into memory) and yield chunk
+    docs tagged with "_row" = (source, row index) for checkpointing. Rows before
+    positions[source] were finished by an earlier run and are skipped.
+    """
     if not load_dataset:
         logging.warning("datasets not installed. Skipping HuggingFace ingestion.")
-        return []
+        return
 
-    logging.info("🌐 Loading HuggingFace dataset: geekyrakshit/Indian-Legal-Acts")
+    logging.info(f"🌐 Streaming HuggingFace dataset: {HF_DATASET}")
 
     try:
-        ds = load_dataset("geekyrakshit/Indian-Legal-Acts")
+        ds = load_dataset(HF_DATASET, streaming=True)
     except Exception as e:
-        logging.error(f"❌ Failed to download dataset: {e}")
-        return []
+        logging.error(f"❌ Failed to open dataset: {e}")
+        return
 
-    docs = []
+    positions = positions or {}
     selected_splits = list(ds.keys()) if include_states else ["central"]
 
     for split in selected_splits:
-        for i, row in enumerate(ds[split]):
-            act = row.get("Short Title") or "Unknown Act"
-            section = row.get("Act Number") or f"Act_{i}"
-            text = row.get("Markdown") or ""
-            source_link = row.get("View") or ""
-            entity = row.get("Entity") or "central"
-
-            if not text.strip():
-                continue
-
-            doc_id = make_unique_id(f"{split}_{act.replace(' ', '_')}")
-            docs.append(make_doc(
-                doc_id=doc_id,
-                act=act,
-                section=str(section),
-                text=text,
-                jurisdiction="central" if entity.lower() == "central" else "state",
-                state=entity.replace("_", " ").title(),
-                source_link=source_link
-            ))
+        source = f"hf:{split}"
+        start = positions.get(source, 0)
+        rows = ds[split].skip(start) if start else ds[split]
+        if start:
+            logging.info(f"⏩ {source}: resuming at row {start}")
+        for i, row in enumerate(rows, start=start):
+            for doc in act_row_docs(row, split, i):
+                doc["_row"] = (source, i)
+                yield doc
+
+
+# ===== Manifest + checkpoint =====
+def load_manifest():
+    """{"model": ..., "sections": {id: {"source", "act", "section"}}} of what is indexed."""
+    if not os.path.exists(MANIFEST_PATH):
+        return {"model": EMBEDDING_MODEL_NAME, "sections": {}}
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def save_manifest(manifest):
+    _write_json_atomic(MANIFEST_PATH, manifest)
+
+
+def load_checkpoint(run_key, resume=True):
+    """Progress of an interrupted run with the same options, or a fresh checkpoint."""
+    fresh = {
+        "run": run_key, "positions": {}, "sources": [],
+        "seen_offset": 0, "seen_count": 0, "export_offset": 0, "export_count": 0,
+    }
+    if not resume or not os.path.exists(CHECKPOINT_PATH):
+        return fresh
+    with open(CHECKPOINT_PATH, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("run") != run_key or "seen_offset" not in checkpoint:
+        logging.info("🆕 Checkpoint is from a run with different options; starting over")
+        return fresh
+    logging.info(f"♻ Resuming interrupted ingest ({checkpoint['seen_count']} docs already processed)")
+    return checkpoint
+
+
+class SeenLog:
+    """
+    Append-only log of the doc IDs a run has processed, next to the checkpoint.
+    A checkpoint records only its byte offset, so saving progress costs the IDs
+    added since the last save instead of rewriting the whole set; on resume the
+    log is read back up to that offset (anything after it was not checkpointed).
+    """
+
+    def __init__(self, path, offset=0):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ids = set()
+        if offset and os.path.exists(path):
+            self._f = open(path, "r+b")
+            self.ids.update(self._f.read(offset).decode("utf-8").split())
+            self._f.seek(offset)
+            self._f.truncate()
+        else:
+            self._f = open(path, "wb")
 
-    logging.info(f"📚 Successfully mapped {len(docs)} acts from HuggingFace")
-    return docs
+    def __contains__(self, doc_id):
+        return doc_id in self.ids
 
+    def __len__(self):
+        return len(self.ids)
 
-# ===== Build ChromaDB Index =====
-def build_chroma_index(docs):
-    logging.info("🚀 Creating vector embeddings...")
-    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    def add(self, doc_id):
+        self.ids.add(doc_id)
+        self._f.write(doc_id.encode("utf-8") + b"\n")
 
-    client = chromadb.PersistentClient(path=CHROMA_DB_DIR, settings=Settings(allow_reset=True))
-    collection = client.get_or_create_collection("legal_sections")
+    def offset(self):
+        self._f.flush()
+        return self._f.tell()
 
-    texts = [d["text"] for d in docs]
-    ids = [d["id"] for d in docs]
+    def remove(self):
+        self._f.close()
+        os.remove(self.path)
 
-    assert len(ids) == len(set(ids)), "❌ Duplicate IDs found — uniqueness check failed"
 
-    embeddings = model.encode(texts, batch_size=32, show_progress_bar=True).tolist()
+class JsonArrayWriter:
+    """
+    Streams docs into a compact JSON array (backend/scripts/importLegalSections.ts
+    reads it). Can reopen at a checkpointed byte offset to resume a run.
+    """
 
-    collection.upsert(
-        ids=ids,
-        documents=texts,
-        metadatas=[{k: d[k] for k in ["act", "section", "jurisdiction", "state", "source_link"]} for d in docs],
-        embeddings=embeddings
+    def __init__(self, path, offset=0, count=0):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.count = count
+        self._f = open(path, "r+b" if offset and os.path.exists(path) else "wb")
+        if self.count:
+            self._f.seek(offset)
+            self._f.truncate()
+        else:
+            self._f.write(b"[")
+
+    def write(self, doc):
+        prefix = b",\n" if self.count else b"\n"
+        self._f.write(prefix + json.dumps(doc, ensure_ascii=False).encode("utf-8"))
+        self.count += 1
+
+    def offset(self):
+        self._f.flush()
+        return self._f.tell()
+
+    def close(self):
+        self._f.write(b"\n]\n")
+        self._f.close()
+
+
+def iter_batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ===== Build ChromaDB Index (incremental, batched, partitioned by state) =====
+def migrate_legacy_collection(client, page_size=5000):
+    """
+    Move an unpartitioned "legal_sections" collection (pre-partitioning ingests)
+    into per-state partitions, reusing the stored embeddings, then drop it.
+    """
+    names = [getattr(c, "name", c) for c in client.list_collections()]
+    if COLLECTION_NAME not in names:
+        return
+    legacy = client.get_collection(COLLECTION_NAME)
+    total = legacy.count()
+    logging.info(f"🔀 Splitting unpartitioned index ({total} vectors) into state partitions...")
+
+    partitions = {}
+    for offset in range(0, total, page_size):
+        page = legacy.get(include=["documents", "metadatas", "embeddings"], limit=page_size, offset=offset)
+        groups = {}
+        for doc_id, text, meta, emb in zip(page["ids"], page["documents"], page["metadatas"], page["embeddings"]):
+            meta = meta or {}
+            groups.setdefault(partition_name(meta.get("state"), meta.get("jurisdiction")), []).append((doc_id, text, meta, emb))
+        for name, rows in groups.items():
+            if name not in partitions:
+                partitions[name] = client.get_or_create_collection(name)
+            partitions[name].upsert(
+                ids=[r[0] for r in rows],
+                documents=[r[1] for r in rows],
+                metadatas=[r[2] for r in rows],
+                embeddings=[list(map(float, r[3])) for r in rows],
+            )
+    client.delete_collection(COLLECTION_NAME)
+    logging.info(f"✅ Index split into {len(partitions)} partitions")
+
+
+class ChromaSync:
+    """
+    Keeps Chroma in step with a stream of docs, one batch at a time: embed +
+    upsert only IDs that aren't indexed yet, then (in finish) delete indexed IDs
+    from the same sources that no longer appear. Sources not ingested in this run
+    (e.g. state acts with --central-only) are left alone. `rebuild` re-embeds
+    everything; `prune_unknown` also deletes vectors missing from the manifest
+    (e.g. uuid-ID duplicates from older ingests).
+
+    Each doc goes to its partition collection (central acts / one per state),
+    so a query only ever searches two small indexes.
+    """
+
+    def __init__(self, rebuild=False, prune_unknown=False, encode_batch_size=32):
+        self.client = open_chroma_client(allow_reset=True)
+        migrate_legacy_collection(self.client)
+        self.partitions = list_partitions(self.client)
+        self.manifest = load_manifest()
+        if self.manifest.get("model") != EMBEDDING_MODEL_NAME:
+            logging.info(
+                f"🔁 Embedding model changed ({self.manifest.get('model')} → {EMBEDDING_MODEL_NAME}); re-embedding all"
+            )
+            rebuild = True
+        self.rebuild = rebuild
+        self.prune_unknown = prune_unknown
+        self.encode_batch_size = encode_batch_size
+        self.previous = dict(self.manifest["sections"])
+        if rebuild:
+            self.manifest["sections"] = {}
+        # id → partition of every vector already in Chroma
+        self.location = {
+            doc_id: name
+            for name, collection in self.partitions.items()
+            for doc_id in collection.get(include=[])["ids"]
+        }
+        self._model = None
+        self.added = 0
+        self.unchanged = 0
+        self.embed_ms = []
+
+    @property
+    def model(self):
+        if self._model is None:
+            logging.info("🚀 Loading embedding model...")
+            self._model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        return self._model
+
+    def partition(self, name):
+        if name not in self.partitions:
+            self.partitions[name] = self.client.get_or_create_collection(name)
+        return self.partitions[name]
+
+    def add_batch(self, docs):
+        indexed = self.manifest["sections"]
+        to_add = [d for d in docs if d["id"] not in indexed or d["id"] not in self.location]
+        self.unchanged += len(docs) - len(to_add)
+
+        if to_add:
+            t0 = time.perf_counter()
+            embeddings = self.model.encode(
+                [d["text"] for d in to_add], batch_size=self.encode_batch_size, convert_to_numpy=True
+            ).astype("float32")
+            self.embed_ms.append((time.perf_counter() - t0) * 1000)
+
+            groups = {}
+            for d, emb in zip(to_add, embeddings):
+                groups.setdefault(partition_name(d.get("state"), d.get("jurisdiction")), []).append((d, emb))
+            for name, rows in groups.items():
+                self.partition(name).upsert(
+                    ids=[d["id"] for d, _ in rows],
+                    documents=[d["text"] for d, _ in rows],
+                    metadatas=[{k: d[k] for k in METADATA_KEYS if k in d} for d, _ in rows],
+                    embeddings=[emb.tolist() for _, emb in rows],
+                )
+                self.location.update((d["id"], name) for d, _ in rows)
+            self.added += len(to_add)
+
+        for d in docs:
+            indexed[d["id"]] = {"source": d["source"], "act": d["act"], "section": d["section"]}
+
+    def finish(self, seen, sources):
+        to_delete = {
+            doc_id for doc_id, entry in self.previous.items()
+            if entry.get("source") in sources and doc_id not in seen
+        }
+        if self.prune_unknown:
+            to_delete |= {doc_id for doc_id in self.location if doc_id not in self.previous and doc_id not in seen}
+        to_delete &= set(self.location)
+
+        by_partition = {}
+        for doc_id in to_delete:
+            by_partition.setdefault(self.location.pop(doc_id), []).append(doc_id)
+        for name, ids in by_partition.items():
+            for batch in iter_batches(sorted(ids), 5000):
+                self.partitions[name].delete(ids=batch)
+        for doc_id in to_delete:
+            self.manifest["sections"].pop(doc_id, None)
+        self.manifest["model"] = EMBEDDING_MODEL_NAME
+        save_manifest(self.manifest)
+
+        logging.info(
+            f"📊 Ingest diff: {self.added} new/changed, {len(to_delete)} removed, {self.unchanged} unchanged"
+        )
+        logging.info(f"🎉 Chroma Index Built Successfully! ({len(self.partitions)} partitions)")
+
+
+def run_ingest(doc_stream, args, checkpoint, export_path):
+    """
+    source → dedupe → export → embed/upsert in batches, checkpointing every
+    `args.checkpoint_every` batches so an interrupted run resumes where it stopped.
+    """
+    seen = SeenLog(SEEN_LOG_PATH, checkpoint["seen_offset"])
+    sources = set(checkpoint["sources"])
+
+    # A resumed --rebuild keeps what the interrupted run already re-embedded
+    sync = ChromaSync(rebuild=args.rebuild and not seen, prune_unknown=args.prune_unknown)
+    writer = JsonArrayWriter(export_path, checkpoint["export_offset"], checkpoint["export_count"])
+
+    def save_progress(last_rows):
+        checkpoint["positions"].update(last_rows)
+        checkpoint.update(
+            seen_offset=seen.offset(),
+            seen_count=len(seen),
+            sources=sorted(sources),
+            export_offset=writer.offset(),
+            export_count=writer.count,
+        )
+        save_manifest(sync.manifest)
+        _write_json_atomic(CHECKPOINT_PATH, checkpoint)
+
+    def unique(docs):
+        for d in docs:
+            if d["id"] in seen:
+                continue
+            seen.add(d["id"])
+            sources.add(d["source"])
+            yield d
+
+    start = time.perf_counter()
+    processed = 0
+    last_rows = {}
+    for n, batch in enumerate(iter_batches(unique(doc_stream), args.batch_size), start=1):
+        for d in batch:
+            row = d.pop("_row", None)
+            if row is not None:
+                # Rows strictly before this one are complete (a row's chunks may span batches)
+                last_rows[row[0]] = row[1]
+            writer.write(d)
+        sync.add_batch(batch)
+        processed += len(batch)
+
+        elapsed = time.perf_counter() - start
+        embed = f"{sync.embed_ms[-1]:.0f} ms" if sync.embed_ms else "-"
+        logging.info(
+            f"⚙ batch {n}: {processed} docs | {processed / max(elapsed, 1e-9):.1f} docs/s | "
+            f"embed {embed}/batch | {sync.added} embedded, {sync.unchanged} unchanged"
+        )
+        if n % args.checkpoint_every == 0:
+            save_progress(last_rows)
+
+    writer.close()
+    if not seen:
+        seen.remove()
+        logging.error("❌ No documents found. Aborting.")
+        return False
+
+    sync.finish(seen.ids, sources)
+    if os.path.exists(CHECKPOINT_PATH):
+        os.remove(CHECKPOINT_PATH)
+    seen.remove()
+
+    elapsed = time.perf_counter() - start
+    avg_embed = sum(sync.embed_ms) / len(sync.embed_ms) if sync.embed_ms else 0.0
+    logging.info(
+        f"🏁 {len(seen)} docs in {elapsed:.1f}s ({len(seen) / max(elapsed, 1e-9):.1f} docs/s), "
+        f"avg embed {avg_embed:.0f} ms/batch"
     )
+    logging.info(f"💾 Exported {writer.count} sections to {export_path}")
+    return True
+
+
+# ===== Build BM25 Index (lexical half of hybrid retrieval) =====
+def build_bm25_index(rows):
+    """rows: iterable of (id, text, state)."""
+    logging.info("🔤 Building BM25 inverted index...")
+    index = BM25Index.from_rows(rows)
+    index.save(BM25_INDEX_DIR)
+    logging.info(f"🎉 BM25 Index Built: {len(index)} docs, {len(index.vocab)} terms → {BM25_INDEX_DIR}")
+
 
-    logging.info("🎉 Chroma Index Built Successfully!")
+def iter_indexed_docs(page_size=5000):
+    """(id, text, state) for everything in Chroma, paged so the corpus is never fully in memory."""
+    for collection in index_collections(open_chroma_client()):
+        for offset in range(0, collection.count(), page_size):
+            rows = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            for doc_id, text, meta in zip(rows["ids"], rows["documents"], rows["metadatas"]):
+                yield doc_id, text or "", (meta or {}).get("state")
 
 
 # ================= MAIN =================
@@ -174,35 +603,39 @@ def main():
     parser.add_argument("--skip-pdf", action="store_true", help="Skip BNS/BNSS PDF extraction")
     parser.add_argument("--only-hf", action="store_true", help="Only ingest HuggingFace dataset")
     parser.add_argument("--central-only", action="store_true", help="Ignore state acts")
+    parser.add_argument("--pdf-workers", type=int, default=None, help="Processes for PDF page extraction (default: CPU count)")
+    parser.add_argument("--rebuild", action="store_true", help="Re-embed every section instead of only new/changed ones")
+    parser.add_argument("--prune-unknown", action="store_true",
+                        help="Delete indexed vectors not in the manifest (cleans up duplicates from older uuid-based ingests)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Docs embedded + upserted per batch")
+    parser.add_argument("--checkpoint-every", type=int, default=20, help="Save progress every N batches")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore the checkpoint of an interrupted run")
+    parser.add_argument("--bm25-only", action="store_true", help="Rebuild the BM25 index from the existing Chroma index")
     args = parser.parse_args()
 
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    docs = []
-
-    if not args.only_hf:
-        if not args.skip_pdf:
-            docs.extend(load_manual_pdfs(base_dir))
-        else:
-            logging.info("⏭ Skipping PDF ingestion")
-
-    docs.extend(load_huggingface_acts(include_states=not args.central_only))
-
-    if not docs:
-        logging.error("❌ No documents found. Aborting.")
+    if args.bm25_only:
+        build_bm25_index(iter_indexed_docs())
         return
 
-    # 🆕 JSON Export
-    data_dir = os.path.join(base_dir, "data")
-    os.makedirs(data_dir, exist_ok=True)
-
-    out_path = os.path.join(data_dir, "legal_sections.json")
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(docs, f, ensure_ascii=False, indent=2)
-
-    logging.info(f"💾 Exported {len(docs)} sections to {out_path}")
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # A checkpoint only applies to a rerun with the same sources
+    run_key = f"skip_pdf={args.skip_pdf or args.only_hf};central_only={args.central_only};rebuild={args.rebuild}"
+    checkpoint = load_checkpoint(run_key, resume=not args.no_resume)
+
+    def doc_stream():
+        if not args.only_hf:
+            if not args.skip_pdf:
+                yield from iter_manual_pdfs(base_dir, args.pdf_workers)
+            else:
+                logging.info("⏭ Skipping PDF ingestion")
+        yield from iter_huggingface_acts(include_states=not args.central_only, positions=checkpoint["positions"])
+
+    export_path = os.path.join(base_dir, "data", "legal_sections.json")
+    if not run_ingest(doc_stream(), args, checkpoint, export_path):
+        return
 
-    # Existing step
-    build_chroma_index(docs)
+    # BM25 covers the whole index, including sources not ingested in this run
+    build_bm25_index(iter_indexed_docs())
 
 
 if __name__ == "__main__":
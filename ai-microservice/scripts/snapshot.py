@@ -0,0 +1,136 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+from config import EMBEDDING_MODEL_NAME
+from core.snapshot import load_snapshot, verify_snapshot, write_snapshot
+from scripts.ingest import (
+    METADATA_KEYS,
+    build_bm25_index,
+    iter_batches,
+    load_manifest,
+    migrate_legacy_collection,
+    save_manifest,
+)
+from services.vector_store import index_collections, open_chroma_client, partition_name
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+
+# ================= EXPORT =================
+def iter_chroma_rows(collections, page_size):
+    """
+    (section dict, embedding) for every indexed vector, paged from Chroma one
+    partition at a time, so each partition is a contiguous block of rows.
+    """
+    for collection in collections:
+        for offset in range(0, collection.count(), page_size):
+            page = collection.get(include=["documents", "metadatas", "embeddings"], limit=page_size, offset=offset)
+            for doc_id, text, meta, emb in zip(page["ids"], page["documents"], page["metadatas"], page["embeddings"]):
+                yield {"id": doc_id, "text": text or "", **(meta or {})}, emb
+
+
+def export_snapshot(out_dir, dtype, page_size):
+    collections = index_collections(open_chroma_client())
+    count = sum(c.count() for c in collections)
+    if not count:
+        logging.error("❌ Chroma index is empty — nothing to export.")
+        return False
+
+    first = next(c for c in collections if c.count()).get(include=["embeddings"], limit=1)["embeddings"][0]
+    dim = len(first)
+
+    t0 = time.perf_counter()
+    manifest = write_snapshot(
+        out_dir,
+        iter_chroma_rows(collections, page_size),
+        count=count,
+        dim=dim,
+        model=EMBEDDING_MODEL_NAME,
+        dtype=dtype,
+        extra={"collection": "legal_sections", "partitions": len(collections)},
+    )
+    size_mb = sum(f["bytes"] for f in manifest["files"].values()) / 1e6
+    logging.info(
+        f"📦 Snapshot {manifest['snapshot_version']}: {count} sections × {dim} ({dtype}), "
+        f"{size_mb:.1f} MB → {out_dir} in {time.perf_counter() - t0:.1f}s"
+    )
+    return True
+
+
+# ================= IMPORT =================
+def import_snapshot(path, batch_size, verify=True):
+    """Load a snapshot into Chroma (+ ingest manifest + BM25) without any embedding work."""
+    t0 = time.perf_counter()
+    snapshot = load_snapshot(path, verify=verify, expected_model=EMBEDDING_MODEL_NAME)
+    client = open_chroma_client(allow_reset=True)
+    migrate_legacy_collection(client)
+
+    manifest = load_manifest()
+    if manifest.get("model") != snapshot.model:
+        manifest = {"model": snapshot.model, "sections": {}}
+
+    row = 0
+    for batch in iter_batches(snapshot.iter_sections(), batch_size):
+        embeddings = np.asarray(snapshot.embeddings[row:row + len(batch)], dtype=np.float32)
+        groups = {}
+        for s, emb in zip(batch, embeddings):
+            groups.setdefault(partition_name(s.get("state"), s.get("jurisdiction")), []).append((s, emb))
+        for name, rows in groups.items():
+            client.get_or_create_collection(name).upsert(
+                ids=[s["id"] for s, _ in rows],
+                documents=[s["text"] for s, _ in rows],
+                metadatas=[{k: s[k] for k in METADATA_KEYS if s.get(k) is not None} for s, _ in rows],
+                embeddings=[emb.tolist() for _, emb in rows],
+            )
+        for s in batch:
+            manifest["sections"][s["id"]] = {"source": s.get("source", ""), "act": s.get("act"), "section": s.get("section")}
+        row += len(batch)
+        logging.info(f"⚙ Imported {row}/{len(snapshot)} sections")
+
+    save_manifest(manifest)
+    build_bm25_index((s["id"], s["text"], s.get("state")) for s in snapshot.iter_sections())
+    logging.info(f"✅ Imported snapshot {snapshot.manifest['snapshot_version']} in {time.perf_counter() - t0:.1f}s")
+
+
+# ================= MAIN =================
+def main():
+    parser = argparse.ArgumentParser(description="Export / import / verify portable index snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="Write the current Chroma index as a snapshot")
+    p_export.add_argument("--out", default=None, help="Output directory (default: ./snapshots/<timestamp>)")
+    p_export.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    p_export.add_argument("--page-size", type=int, default=2000)
+
+    p_import = sub.add_parser("import", help="Load a snapshot into Chroma without re-embedding")
+    p_import.add_argument("path")
+    p_import.add_argument("--batch-size", type=int, default=1000)
+    p_import.add_argument("--no-verify", action="store_true", help="Skip checksum verification")
+
+    p_verify = sub.add_parser("verify", help="Check a snapshot's files against its manifest")
+    p_verify.add_argument("path")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        out_dir = args.out or os.path.join("snapshots", time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()))
+        if not export_snapshot(out_dir, args.dtype, args.page_size):
+            sys.exit(1)
+    elif args.command == "import":
+        import_snapshot(args.path, args.batch_size, verify=not args.no_verify)
+    else:
+        problems = verify_snapshot(args.path)
+        for problem in problems:
+            logging.error(f"❌ {problem}")
+        if problems:
+            sys.exit(1)
+        logging.info("✅ Snapshot OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# services/answer_cache.py
+
+import itertools
+import logging
+import os
+import pickle
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from core.cache import LRUCache
+from config import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_PATH,
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_TTL,
+)
+
+# Persist to disk after this many new entries (and always on shutdown)
+_SAVE_EVERY = 25
+
+
+class SemanticAnswerCache:
+    """
+    Cache of validated English answers for the LEGAL path of process_query.
+
+    Entries are looked up by cosine similarity of the normalized English query
+    embedding, scoped to (user_state, explanation_mode). A hit skips retrieval,
+    rerank, generation and validation; only translation to the user's language
+    is left. The whole cache is dropped when the vector index changes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl: Optional[float] = ANSWER_CACHE_TTL,
+        threshold: float = ANSWER_CACHE_SIMILARITY,
+        path: Optional[str] = ANSWER_CACHE_PATH,
+    ):
+        self.threshold = threshold
+        self.path = path
+        self._entries = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._ids = itertools.count()
+        self._index_version: Optional[str] = None
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()  # one writer of the .tmp file at a time
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def lookup(
+        self,
+        embedding: Sequence[float],
+        user_state: str,
+        explanation_mode: str,
+        index_version: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Return the cached response fields for the most similar query above threshold."""
+        self._check_index(index_version)
+        query_vec = _unit(embedding)
+        scope = (user_state, explanation_mode)
+
+        best_key, best_score = None, self.threshold
+        for key, entry in self._entries.items():
+            if entry["scope"] != scope:
+                continue
+            score = float(np.dot(entry["embedding"], query_vec))
+            if score >= best_score:
+                best_key, best_score = key, score
+
+        entry = self._entries.get(best_key) if best_key is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            return None
+
+        logging.info(f"♻ Answer cache hit (similarity={best_score:.3f})")
+        return entry["response"]
+
+    def store(
+        self,
+        embedding: Sequence[float],
+        user_state: str,
+        explanation_mode: str,
+        index_version: str,
+        response: Dict[str, Any],
+    ) -> None:
+        self._check_index(index_version)
+        self._entries.set(next(self._ids), {
+            "scope": (user_state, explanation_mode),
+            "embedding": _unit(embedding),
+            "response": response,
+        })
+        with self._lock:
+            self._unsaved += 1
+            due = self._unsaved >= _SAVE_EVERY
+        if due:
+            self.persist()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def persist(self) -> None:
+        """Write the cache to disk (atomic replace). No-op without a path."""
+        if not self.path:
+            return
+        with self._persist_lock:
+            with self._lock:
+                self._unsaved = 0
+                state = {"index_version": self._index_version, "entries": self._entries.dump()}
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logging.error(f"⚠ Failed to persist answer cache: {e}")
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            logging.error(f"⚠ Ignoring unreadable answer cache {self.path}: {e}")
+            return
+
+        entries = state.get("entries", [])
+        self._index_version = state.get("index_version")
+        self._entries.load(entries)
+        # keep new ids clear of restored ones
+        self._ids = itertools.count(max((k for k, _, _ in entries), default=-1) + 1)
+        logging.info(f"📦 Loaded {len(self._entries)} cached answers from {self.path}")
+
+    def _check_index(self, index_version: str) -> None:
+        with self._lock:
+            if self._index_version == index_version:
+                return
+            if self._index_version is not None:
+                logging.info("🔄 Vector index changed — clearing answer cache")
+            self._index_version = index_version
+        self._entries.clear()
+
+
+def _unit(vec: Sequence[float]) -> np.ndarray:
+    arr = np.asarray(vec, dtype=np.float32)
+    norm = np.linalg.norm(arr)
+    return arr / norm if norm else arr
+
+
+answer_cache: Optional[SemanticAnswerCache] = SemanticAnswerCache() if ANSWER_CACHE_ENABLED else None
@@ -0,0 +1,238 @@
+# services/citations.py
+
+import logging
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.embeddings import fetch_sections, index_fingerprint
+from services.vector_store import get_vector_store, partition_name, search_partitions
+from config import CITATION_PRIMARY_ACTS
+
+# Common short names → canonical act key (see act_key()).
+ACT_ALIASES = {
+    "bns": "bharatiya nyaya sanhita",
+    "bnss": "bharatiya nagarik suraksha sanhita",
+    "bsa": "bharatiya sakshya adhiniyam",
+    "ipc": "indian penal code",
+    "i.p.c": "indian penal code",
+    "crpc": "code of criminal procedure",
+    "cr.p.c": "code of criminal procedure",
+    "iea": "indian evidence act",
+    "it act": "information technology act",
+    "mv act": "motor vehicles act",
+    "ndps": "narcotic drugs and psychotropic substances act",
+    "pocso": "protection of children from sexual offences act",
+    "बीएनएस": "bharatiya nyaya sanhita",
+    "भारतीय न्याय संहिता": "bharatiya nyaya sanhita",
+    "बीएनएसएस": "bharatiya nagarik suraksha sanhita",
+    "भारतीय नागरिक सुरक्षा संहिता": "bharatiya nagarik suraksha sanhita",
+    "आईपीसी": "indian penal code",
+    "भारतीय दंड संहिता": "indian penal code",
+    "सीआरपीसी": "code of criminal procedure",
+}
+
+# "Section" in English shorthand and the supported Indian languages
+SECTION_WORDS = [
+    "section", "sec.", "sec", "s.", "u/s", "u/s.",
+    "धारा", "कलम", "ಸೆಕ್ಷನ್", "ಕಲಂ", "பிரிவு", "సెక్షన్", "ধারা", "ધારા", "വകുപ്പ്",
+]
+
+# Words that don't turn a bare citation into an explanation request
+_FILLER = {
+    "what", "is", "show", "me", "the", "text", "of", "read", "full", "give", "display",
+    "section", "sec", "s", "u", "act", "please", "pls", "under", "in", "a", "an", "about",
+    "open", "find", "get", "details", "provision", "law", "bare", "exact", "wording",
+    "क्या", "है", "की", "का", "के", "दिखाओ", "दिखाइए", "पढ़ें",
+}
+
+_SECTION_NUMBER = re.compile(r"^(?:section\s*)?(\d+[A-Z]?)$", re.IGNORECASE)
+
+
+def act_key(name: str) -> str:
+    """Canonical act key: lowercase, no leading 'the', no year, no punctuation."""
+    key = name.lower()
+    key = re.sub(r"\b(18|19|20)\d{2}\b", " ", key)
+    key = re.sub(r"[^\w\s]", " ", key)
+    key = re.sub(r"^\s*the\s+", "", key)
+    return " ".join(key.split())
+
+
+def _ascii_digits(text: str) -> str:
+    """Map Devanagari/Kannada/Tamil/... digits to ASCII so 'धारा ३०२' parses."""
+    return "".join(
+        str(unicodedata.digit(ch)) if ch.isdigit() and not ch.isascii() else ch
+        for ch in text
+    )
+
+
+def _words_pattern(phrase: str) -> str:
+    return r"\s+".join(re.escape(w) for w in phrase.split())
+
+
+@dataclass
+class Citation:
+    section: str                 # "302", "376A"
+    act: Optional[str] = None    # canonical act key, None if not stated
+    span: Tuple[int, int] = (0, 0)
+
+
+@dataclass
+class CitationMatch:
+    citation: Citation
+    docs: List[Dict[str, Any]] = field(default_factory=list)
+    wants_explanation: bool = False
+    ambiguous: bool = False  # docs span several (act, section) keys: candidates, not the answer
+
+
+class CitationIndex:
+    """
+    In-memory (act key, section number) → section docs, built from the indexed
+    corpus. Only section-level documents ("Section 303") are indexed.
+    """
+
+    def __init__(self, docs: List[Dict[str, Any]], fingerprint: str = ""):
+        self.fingerprint = fingerprint
+        self._by_key: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._by_section: Dict[str, List[Dict[str, Any]]] = {}
+        act_names = {}
+
+        for doc in docs:
+            m = _SECTION_NUMBER.match((doc.get("section") or "").strip())
+            if not m or not doc.get("act"):
+                continue
+            key = act_key(doc["act"])
+            number = m.group(1).upper()
+            self._by_key.setdefault((key, number), []).append(doc)
+            self._by_section.setdefault(number, []).append(doc)
+            act_names[key] = key
+
+        # Long sections are stored as several passages; keep them in reading order
+        for group in (*self._by_key.values(), *self._by_section.values()):
+            group.sort(key=lambda d: (d.get("act") or "", d.get("parent_id") or "", d.get("chunk_index") or 0))
+
+        names = {**ACT_ALIASES, **act_names}
+        self._aliases = {" ".join(alias.split()): canonical for alias, canonical in names.items()}
+        self._compile(sorted(self._aliases, key=len, reverse=True))
+        logging.info(f"🔖 Citation index: {len(self._by_key)} (act, section) keys")
+
+    def _compile(self, act_names: List[str]) -> None:
+        acts = "|".join(_words_pattern(a) for a in act_names if a)
+        kws = "|".join(re.escape(w) for w in sorted(SECTION_WORDS, key=len, reverse=True))
+        num = r"(?P<num>\d{1,4}[A-Z]?)(?![\w])"
+        act = rf"(?P<act>{acts})(?![A-Za-z])(?:\s*,?\s*(?:18|19|20)\d{{2}})?"
+        left = r"(?<![A-Za-z0-9])"
+        self._patterns = [
+            # "Section 303 BNS", "S. 302 of IPC", "u/s 173 BNSS", "धारा 302"
+            re.compile(rf"{left}(?:{kws})\s*{num}(?:\s*(?:of|under|in|,)?\s*(?:the\s+)?{act})?", re.IGNORECASE),
+            # "BNS Section 303", "IPC 302", "आईपीसी की धारा 302"
+            re.compile(rf"{left}{act}\s*(?:(?:of|की|का|के)\s*)?(?:(?:{kws})\s*)?{num}", re.IGNORECASE),
+            # "302 IPC"
+            re.compile(rf"{left}{num}\s+{act}", re.IGNORECASE),
+        ]
+
+    def parse(self, query: str) -> Optional[Citation]:
+        text = _ascii_digits(query)
+        found = []
+        for pattern in self._patterns:
+            m = pattern.search(text)
+            if not m:
+                continue
+            number = m.group("num").upper()
+            if len(number) == 4 and number[:2] in ("18", "19", "20"):
+                continue  # a year, not a section
+            act = m.groupdict().get("act")
+            found.append(Citation(section=number, act=self._canonical(act) if act else None, span=m.span()))
+        # Prefer a citation that names its act ("BNS section 303" over bare "section 303")
+        found.sort(key=lambda c: c.act is None)
+        return found[0] if found else None
+
+    def _canonical(self, act_text: str) -> str:
+        cleaned = " ".join(act_text.lower().split())
+        return self._aliases.get(cleaned) or self._aliases.get(act_key(cleaned)) or act_key(cleaned)
+
+    def lookup(self, citation: Citation, state: Optional[str] = None) -> List[Dict[str, Any]]:
+        if citation.act:
+            docs = self._by_key.get((citation.act, citation.section), [])
+        else:
+            docs = self._by_section.get(citation.section, [])
+        if state:
+            partitions = search_partitions(state)
+            docs = [d for d in docs if partition_name(d.get("state"), d.get("jurisdiction")) in partitions]
+        return docs
+
+    def match(self, query: str, state: Optional[str] = None) -> Optional[CitationMatch]:
+        citation = self.parse(query)
+        if citation is None:
+            return None
+        docs = self.lookup(citation, state)
+        if not docs:
+            return None
+        docs, ambiguous = self._resolve_act(citation, docs)
+        start, end = citation.span
+        # Whitespace/punctuation split (\w drops Indic vowel signs)
+        rest = re.findall(r"[^\s?.,!:;()\"'/-]+", (query[:start] + " " + query[end:]).lower())
+        return CitationMatch(
+            citation=citation,
+            docs=docs,
+            wants_explanation=any(w not in _FILLER for w in rest),
+            ambiguous=ambiguous,
+        )
+
+    @staticmethod
+    def _resolve_act(citation: Citation, docs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], bool]:
+        """An act-less number shared by several acts → the preferred act's docs, else ambiguous."""
+        acts = {act_key(d.get("act") or "") for d in docs}
+        if citation.act or len(acts) == 1:
+            return docs, False
+        for preferred in CITATION_PRIMARY_ACTS:
+            key = ACT_ALIASES.get(preferred.lower(), act_key(preferred))  # "BNS" or the full title
+            if key in acts:
+                return [d for d in docs if act_key(d.get("act") or "") == key], False
+        return docs, True
+
+
+# ================= Shared index (lazy, refreshed when the vector index changes) =================
+_index: Optional[CitationIndex] = None
+_lock = threading.Lock()
+_checked_at = 0.0
+_REFRESH_CHECK_SECONDS = 60
+
+
+def _build_index() -> CitationIndex:
+    fingerprint = index_fingerprint()
+    ids = [
+        doc_id for doc_id, m in get_vector_store().iter_metadata()
+        if m and _SECTION_NUMBER.match(str(m.get("section") or "").strip())
+    ]
+    docs = list(fetch_sections(ids).values())
+    return CitationIndex(docs, fingerprint)
+
+
+def get_citation_index() -> CitationIndex:
+    """Shared citation index; rebuilt (at most once a minute check) when the vector index changes."""
+    global _index, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < _REFRESH_CHECK_SECONDS:
+        return _index
+    with _lock:
+        if _index is None or (
+            now - _checked_at >= _REFRESH_CHECK_SECONDS and index_fingerprint() != _index.fingerprint
+        ):
+            _index = _build_index()
+        _checked_at = now
+    return _index
+
+
+def match_citation(query: str, state: Optional[str] = None) -> Optional[CitationMatch]:
+    """Exact (act, section) match for citation-style queries, or None."""
+    if not query or not any(ch.isdigit() for ch in query):
+        return None
+    try:
+        return get_citation_index().match(query, state)
+    except Exception as e:
+        logging.error(f"⚠ Citation lookup failed: {e}")
+        return None
@@ -0,0 +1,141 @@
+# services/context.py
+
+import logging
+import math
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.cache import LRUCache, content_key
+from core.chunking import split_sentences
+from core.metrics import LatencyTracker
+from services.embeddings import embed_query, get_embedding_model
+from config import CONTEXT_RANK_PENALTY, CONTEXT_SENTENCE_CACHE_SIZE
+
+# Token counting: tiktoken's cl100k_base is close to the Llama 3 tokenizer Groq serves;
+# without it, ~4 characters per token (English legal prose) keeps budgets conservative
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # not installed, or encoding files unavailable offline
+    _encoding = None
+
+GAP = " … "
+
+# content hash of a sentence → unit-length float32 embedding (sections recur across queries)
+_sentence_embeddings = LRUCache(max_entries=CONTEXT_SENTENCE_CACHE_SIZE)
+
+# Packing latency, and how much context the packer keeps vs. what it was given
+_latency = LatencyTracker()
+_totals = {"calls": 0, "sections_in": 0, "sections_out": 0, "tokens_out": 0}
+_totals_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def format_section(section: Dict[str, Any]) -> str:
+    """One section as it appears in the LLM context."""
+    return f"Act: {section['act']}\nSection: {section['section']}\nText: {section['text']}\n---"
+
+
+def format_context(sections: Sequence[Dict[str, Any]]) -> str:
+    return "\n\n".join(format_section(s) for s in sections)
+
+
+def embed_sentences(sentences: List[str]) -> np.ndarray:
+    """Unit-length embeddings of `sentences` (one row each), cached per sentence."""
+    keys = [content_key(s) for s in sentences]
+    vectors: List[Optional[np.ndarray]] = [_sentence_embeddings.get(k) for k in keys]
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    if missing:
+        encoded = np.asarray(
+            get_embedding_model().encode([sentences[i] for i in missing], batch_size=32), dtype=np.float32
+        )
+        encoded /= np.clip(np.linalg.norm(encoded, axis=1, keepdims=True), 1e-12, None)
+        for i, vec in zip(missing, encoded):
+            vectors[i] = vec
+            _sentence_embeddings.set(keys[i], vec)
+    return np.vstack(vectors)
+
+
+def pack_context(
+    query: str,
+    sections: List[Dict[str, Any]],
+    budget_tokens: int,
+    query_embedding: Optional[Sequence[float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fit the most query-relevant sentences of ranked `sections` into `budget_tokens`
+    (as counted on the format_context output).
+
+    Sentences are scored by cosine similarity to the query, minus a small penalty
+    per rerank position. Each section first gets its best sentence, in rank order,
+    so top sections are always represented; the remaining budget goes to the
+    best-scoring sentences overall. Returns copies of the chosen sections whose
+    "text" keeps the selected sentences in document order, gaps marked with "…".
+    """
+    if not sections:
+        return []
+
+    with _latency.time("pack"):
+        split = [split_sentences(s.get("text") or "") for s in sections]
+        flat = [(i, j) for i, sents in enumerate(split) for j in range(len(sents))]
+        if not flat:
+            return []
+
+        query_vec = np.asarray(query_embedding if query_embedding is not None else embed_query(query), dtype=np.float32)
+        query_vec = query_vec / max(float(np.linalg.norm(query_vec)), 1e-12)
+        sims = embed_sentences([split[i][j] for i, j in flat]) @ query_vec
+        scores = {(i, j): float(sim) - CONTEXT_RANK_PENALTY * i for (i, j), sim in zip(flat, sims)}
+
+        header_cost = [count_tokens(format_section({**s, "text": ""})) + 2 for s in sections]  # + "\n\n" separator
+        chosen: Dict[int, set] = {}
+        used = 0
+
+        def take(i: int, j: int) -> None:
+            nonlocal used
+            # + separator (" " or GAP) before the sentence
+            cost = count_tokens(split[i][j]) + 2 + (0 if i in chosen else header_cost[i])
+            if used + cost <= budget_tokens:
+                chosen.setdefault(i, set()).add(j)
+                used += cost
+
+        # 1) coverage: best sentence of every section, highest-ranked section first
+        for i, sents in enumerate(split):
+            if sents:
+                take(i, max(range(len(sents)), key=lambda j: scores[(i, j)]))
+        # 2) fill: everything else by score
+        for i, j in sorted(scores, key=scores.get, reverse=True):
+            if j not in chosen.get(i, ()):
+                take(i, j)
+
+        packed = []
+        for i in sorted(chosen):
+            picked = sorted(chosen[i])
+            text = split[i][picked[0]]
+            for prev, j in zip(picked, picked[1:]):
+                text += (" " if j == prev + 1 else GAP) + split[i][j]
+            packed.append({**sections[i], "text": text})
+
+    total = count_tokens(format_context(packed))
+    with _totals_lock:
+        _totals["calls"] += 1
+        _totals["sections_in"] += len(sections)
+        _totals["sections_out"] += len(packed)
+        _totals["tokens_out"] += total
+    logging.info(f"✂ Context packed: {len(packed)}/{len(sections)} sections, {total}/{budget_tokens} tokens")
+    return packed
+
+
+def context_stats() -> Dict[str, Any]:
+    return {
+        "tokenizer": "cl100k_base" if _encoding is not None else "chars/4",
+        "latency": _latency.stats,
+        **dict(_totals),
+        "sentence_cache": _sentence_embeddings.stats,
+    }
@@ -1,53 +1,114 @@
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-from config import CHROMA_DB_DIR, EMBEDDING_MODEL_NAME
-
-# Load client & embedding model once (best practice)
-client = chromadb.PersistentClient(
-    path=CHROMA_DB_DIR,
-    settings=Settings(allow_reset=False)
+import logging
+import threading
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from core.batching import MicroBatcher
+from core.cache import LRUCache
+from services.inference import load_embedding_model
+from services.vector_store import get_vector_store
+from config import (
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_MAX_MB,
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_MAX_WAIT_MS,
+)
+
+# Vector store & embedding model are loaded lazily, exactly once (thread-safe), so the
+# app can bind its port immediately and warm up in the background (services/warmup.py)
+_embedding_model = None
+_model_lock = threading.Lock()
+
+
+def get_embedding_model():
+    """Shared embedding model — PyTorch or ONNX Runtime (INFERENCE_BACKEND)."""
+    global _embedding_model
+    if _embedding_model is None:
+        with _model_lock:
+            if _embedding_model is None:
+                logging.info("🧠 Loading embedding model...")
+                _embedding_model = load_embedding_model()
+    return _embedding_model
+
+
+# Concurrent encode requests are merged into one forward pass
+_encode_batcher = MicroBatcher(
+    lambda texts: get_embedding_model().encode(texts, batch_size=len(texts)),
+    max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+    max_wait_ms=EMBEDDING_BATCH_MAX_WAIT_MS,
+    name="embedding-batcher",
 )
 
-collection = client.get_or_create_collection("legal_sections")
-embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+# Memoized query embeddings: (model name, normalized query) → read-only float32 vector.
+# Same queries arrive repeatedly from /answer, /search-sections and backend retries.
+_query_embeddings = LRUCache(
+    max_entries=EMBEDDING_CACHE_SIZE,
+    max_bytes=int(EMBEDDING_CACHE_MAX_MB * 1024 * 1024),
+    sizeof=lambda vec: vec.nbytes,
+)
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a query for embedding/caching (MiniLM is uncased)."""
+    return " ".join(query.lower().split())
+
+
+def embed_query(query: str) -> np.ndarray:
+    """
+    Embed a single (English) query with the shared embedding model.
+    Results are memoized per normalized query; the returned array is read-only.
+    """
+    text = normalize_query(query)
+    key = (EMBEDDING_MODEL_NAME, text)
+
+    vec = _query_embeddings.get(key)
+    if vec is None:
+        vec = np.asarray(_encode_batcher(text), dtype=np.float32)
+        vec.setflags(write=False)
+        _query_embeddings.set(key, vec)
+    return vec
+
+
+def embedding_cache_stats() -> Dict[str, int]:
+    return _query_embeddings.stats
+
+
+def embedding_batch_stats() -> Dict[str, float]:
+    return _encode_batcher.stats
+
+
+def fetch_sections(ids: Sequence[str], state: Optional[str] = None) -> Dict[str, Dict]:
+    """Section dicts for the given ids (missing ids are skipped); `state` narrows where to look first."""
+    if not ids:
+        return {}
+    return get_vector_store().get(ids, state)
+
+
+def index_fingerprint() -> str:
+    """
+    Cheap identifier of the current vector index contents.
+    Changes whenever ingestion adds/removes vectors or a new snapshot is loaded.
+    """
+    return get_vector_store().fingerprint()
+
 
-def retrieve_sections(query: str, state: str, top_k: int = 20):
+def retrieve_sections(
+    query: str,
+    state: str,
+    top_k: int = 20,
+    query_embedding: Optional[Sequence[float]] = None,
+):
     """
-    Retrieve relevant legal sections from Chroma using semantic similarity.
+    Retrieve relevant legal sections from the vector store using semantic similarity.
     - query: normalized English query
     - state: user's state (e.g., Karnataka)
     - top_k: number of results to return (default 5)
+    - query_embedding: precomputed embed_query(query), if the caller already has it
     """
     if not query:
         return []
 
-    query_embedding = embedding_model.encode([query]).tolist()[0]
-
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,  # 👈 now dynamic
-        where={
-            "$or": [
-                {"state": state},
-                {"state": "India"}
-            ]
-        } if state else None
-    )
-
-    docs = []
-    for doc_id, text, metadata in zip(
-        results["ids"][0],
-        results["documents"][0],
-        results["metadatas"][0]
-    ):
-        docs.append({
-            "id": doc_id,
-            "text": text,
-            "act": metadata.get("act"),
-            "section": metadata.get("section"),
-            "jurisdiction": metadata.get("jurisdiction"),
-            "state": metadata.get("state"),
-            "sourceLink": metadata.get("source_link") or metadata.get("sourceLink"),
-        })
-    return docs
+    if query_embedding is None:
+        query_embedding = embed_query(query)
+    return get_vector_store().search(query_embedding, top_k, state)
@@ -0,0 +1,176 @@
+# services/grounding.py
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from core.chunking import split_sentences
+from core.metrics import LatencyTracker
+from core.validation import ValidationResult
+from services.citations import ACT_ALIASES, act_key
+from services.context import embed_sentences
+from services.llm import EVASION_PHRASES, SELF_HARM_PHRASES, SELF_HARM_TOPICS, VIOLENCE_WORDS, validate_answer
+from config import (
+    GROUNDING_VALIDATOR,
+    GROUNDING_ACCEPT,
+    GROUNDING_REJECT,
+    GROUNDING_SUPPORT_SIMILARITY,
+)
+
+# "Section 303", "Sections 64 and 70(2)", "Sec. 173", "u/s 498A"
+_CITED_SECTIONS = re.compile(
+    r"\b(?:sections?|sec\.?|u/s\.?)\s*(\d+[A-Z]?(?:\s*\(\w+\))*(?:\s*(?:,|and|or|&|to|-)\s*\d+[A-Z]?(?:\s*\(\w+\))*)*)",
+    re.IGNORECASE,
+)
+_NUMBER = re.compile(r"\d+[A-Z]?")
+_KNOWN_ACTS = set(ACT_ALIASES.values())
+# Answer sentences that state law (checked against the sections); procedural advice
+# ("visit the police station") is allowed without support, as in validate_answer
+_CLAIM_MARKERS = re.compile(
+    r"\b(?:sections?|sec\.|act|sanhita|code|punish\w*|imprison\w*|fine[ds]?|penalt\w+|offen[cs]e\w*|"
+    r"liable|shall|bail\w*|cognizable|compoundable|years?|months?|rupees|rs\.?|₹)",
+    re.IGNORECASE,
+)
+_BOILERPLATE = ("not legal advice", "consult a lawyer", "consult a qualified", "disclaimer")
+_MIN_CLAIM_WORDS = 6
+
+# Local vs escalated validations, and local validation latency
+_latency = LatencyTracker()
+_counts = {"local_accept": 0, "local_reject": 0, "escalated": 0}
+
+
+@dataclass
+class GroundingReport:
+    score: float                         # 0-1: share of supported claims × share of supported citations
+    claims: int = 0                      # answer sentences stating law, checked against the sources
+    supported_claims: int = 0
+    cited_sections: Set[str] = field(default_factory=set)
+    unsupported_sections: Set[str] = field(default_factory=set)
+    unsupported_acts: Set[str] = field(default_factory=set)
+    high_risk: bool = False
+    risk_uncertain: bool = False
+
+
+def _section_numbers(sections: List[Dict[str, Any]]) -> Set[str]:
+    numbers = set()
+    for s in sections:
+        m = _NUMBER.search(str(s.get("section") or ""))
+        if m:
+            numbers.add(m.group(0).upper())
+    return numbers
+
+
+def cited_sections(answer: str) -> Set[str]:
+    """Section numbers the answer cites ("Sections 64 and 70(2)" → {"64", "70"})."""
+    cited = set()
+    for m in _CITED_SECTIONS.finditer(answer):
+        cited.update(n.upper() for n in _NUMBER.findall(re.sub(r"\(\w+\)", "", m.group(1))))
+    return cited
+
+
+def cited_acts(answer: str) -> Set[str]:
+    """Known acts (canonical keys) named in the answer, by short name or full title."""
+    text = " " + act_key(answer) + " "
+    found = {key for key in _KNOWN_ACTS if f" {key} " in text}
+    for alias, key in ACT_ALIASES.items():
+        if re.search(rf"(?<!\w){re.escape(alias)}(?!\w)", answer, re.IGNORECASE):
+            found.add(key)
+    return found
+
+
+def assess_risk(query: str) -> Dict[str, bool]:
+    """
+    classify_intent's heuristics applied to the query: evasion / first-person self-harm
+    phrases are high risk; violent words ("murder") and self-harm topics ("abetment of
+    suicide") are common in legitimate legal questions, so they only make the verdict
+    uncertain and leave it to the LLM validator.
+    """
+    q = query.lower()
+    high = any(p in q for p in EVASION_PHRASES + SELF_HARM_PHRASES)
+    return {"high_risk": high, "uncertain": not high and any(w in q for w in VIOLENCE_WORDS + SELF_HARM_TOPICS)}
+
+
+def check_grounding(answer: str, sections: List[Dict[str, Any]], query: str) -> GroundingReport:
+    """Citation + embedding-similarity grounding check of `answer` against `sections`."""
+    with _latency.time("local"):
+        risk = assess_risk(query)
+        report = GroundingReport(score=0.0, high_risk=risk["high_risk"], risk_uncertain=risk["uncertain"])
+
+        # 1) Cited section numbers / acts must come from the retrieved sections
+        report.cited_sections = cited_sections(answer)
+        report.unsupported_sections = report.cited_sections - _section_numbers(sections)
+        retrieved_acts = {act_key(s.get("act") or "") for s in sections}
+        report.unsupported_acts = {a for a in cited_acts(answer) if a not in retrieved_acts}
+
+        # 2) Each legal claim in the answer should be close to some source sentence
+        claims = [
+            s for s in split_sentences(answer)
+            if len(s.split()) >= _MIN_CLAIM_WORDS
+            and _CLAIM_MARKERS.search(s)
+            and not any(b in s.lower() for b in _BOILERPLATE)
+        ]
+        sources = [s for sec in sections for s in split_sentences(sec.get("text") or "")]
+        report.claims = len(claims)
+        if claims and sources:
+            sims = embed_sentences(claims) @ embed_sentences(sources).T
+            report.supported_claims = int(np.sum(sims.max(axis=1) >= GROUNDING_SUPPORT_SIMILARITY))
+
+        claim_share = report.supported_claims / report.claims if report.claims else 1.0
+        n_cited = len(report.cited_sections) + len(report.unsupported_acts)
+        n_bad = len(report.unsupported_sections) + len(report.unsupported_acts)
+        citation_share = 1.0 - n_bad / n_cited if n_cited else 1.0
+        report.score = round(claim_share * citation_share, 3)
+    return report
+
+
+async def validate_grounding(
+    answer: str,
+    sections: List[Dict[str, Any]],
+    query: str,
+    sources: Optional[List[Dict[str, Any]]] = None,
+) -> ValidationResult:
+    """
+    Local validation first, against `sources` (the context the answer was written
+    from; defaults to `sections`); the LLM validator (validate_answer) only runs when the
+    local verdict is uncertain: score between GROUNDING_REJECT and GROUNDING_ACCEPT,
+    an answer with no legal claims or citations to check, or a query whose risk
+    the heuristics can't settle.
+    """
+    if GROUNDING_VALIDATOR == "llm" or not answer:
+        return await validate_answer(answer=answer, sections=sections, query=query)
+
+    try:
+        report = await asyncio.to_thread(check_grounding, answer, sources or sections, query)
+    except Exception as e:
+        logging.error(f"❌ Local grounding check failed, using LLM validator: {e}")
+        return await validate_answer(answer=answer, sections=sections, query=query)
+
+    reason = (
+        f"local: score={report.score} claims={report.supported_claims}/{report.claims} "
+        f"unsupported_sections={sorted(report.unsupported_sections)} unsupported_acts={sorted(report.unsupported_acts)}"
+    )
+    if report.high_risk:
+        _counts["local_reject"] += 1
+        return ValidationResult(is_valid=False, confidence=report.score, high_risk=True, reason=reason)
+    checkable = report.claims > 0 or report.cited_sections or report.unsupported_acts
+    if checkable and not report.risk_uncertain:
+        if report.score >= GROUNDING_ACCEPT:
+            _counts["local_accept"] += 1
+            return ValidationResult(is_valid=True, confidence=report.score, high_risk=False, reason=reason)
+        if report.score < GROUNDING_REJECT:
+            _counts["local_reject"] += 1
+            return ValidationResult(is_valid=False, confidence=report.score, high_risk=False, reason=reason)
+
+    _counts["escalated"] += 1
+    logging.info(f"🔎 Grounding uncertain ({reason}) — asking the LLM validator")
+    result = await validate_answer(answer=answer, sections=sections, query=query)
+    result.reason = result.reason or reason
+    return result
+
+
+def grounding_stats() -> Dict[str, Any]:
+    return {"mode": GROUNDING_VALIDATOR, **_counts, "latency": _latency.stats}
@@ -0,0 +1,206 @@
+# services/inference.py
+
+import logging
+import os
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+
+from config import (
+    DEVICE,
+    EMBEDDING_MODEL_NAME,
+    RERANKER_MODEL_NAME,
+    RERANKER_MAX_LENGTH,
+    INFERENCE_BACKEND,
+    ONNX_MODEL_DIR,
+    ONNX_QUANTIZED,
+    ONNX_INTRA_OP_THREADS,
+)
+
+# Optional dependency: only needed for INFERENCE_BACKEND="onnx"
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+EMBEDDING_MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2 sentence-transformers default
+
+
+def onnx_paths(model_name: str, quantized: bool = ONNX_QUANTIZED) -> Tuple[str, str]:
+    """(export directory, model file) for a model under ONNX_MODEL_DIR."""
+    model_dir = os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "__"))
+    filename = "model.int8.onnx" if quantized else "model.onnx"
+    return model_dir, os.path.join(model_dir, filename)
+
+
+def _session(model_path: str) -> "ort.InferenceSession":
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+    options.inter_op_num_threads = 1
+    return ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+
+class OnnxSentenceEncoder:
+    """
+    ONNX Runtime replacement for SentenceTransformer.encode on MiniLM:
+    transformer → mean pooling → L2 normalize (same as the PyTorch pipeline).
+    """
+
+    def __init__(self, model_dir: str, model_path: str, max_seq_length: int = EMBEDDING_MAX_SEQ_LENGTH):
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = _session(model_path)
+        self.max_seq_length = max_seq_length
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32, **_: Any) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        out = []
+        for start in range(0, len(texts), batch_size):
+            enc = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self._input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            mask = enc["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            out.append(pooled.astype(np.float32))
+
+        embeddings = np.concatenate(out) if out else np.zeros((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+
+class OnnxCrossEncoder:
+    """
+    ONNX Runtime replacement for CrossEncoder.predict (single-logit models,
+    sigmoid activation like sentence-transformers' default).
+    """
+
+    def __init__(self, model_dir: str, model_path: str, max_length: int = RERANKER_MAX_LENGTH):
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = _session(model_path)
+        self.max_length = max_length
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def predict(self, pairs: Sequence[Tuple[str, str]], batch_size: int = 32, **_: Any) -> np.ndarray:
+        pairs = list(pairs)
+        scores = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            enc = self.tokenizer(
+                [q for q, _ in batch],
+                [t for _, t in batch],
+                padding=True,
+                truncation="longest_first",
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self._input_names}
+            logits = self.session.run(None, feeds)[0][:, 0]
+            scores.append(1.0 / (1.0 + np.exp(-logits)))
+        return np.concatenate(scores) if scores else np.zeros(0, dtype=np.float32)
+
+
+def _onnx_ready(model_name: str) -> bool:
+    if INFERENCE_BACKEND != "onnx":
+        return False
+    if ort is None:
+        logging.warning("⚠ INFERENCE_BACKEND=onnx but onnxruntime is not installed — using PyTorch.")
+        return False
+    _, model_path = onnx_paths(model_name)
+    if not os.path.exists(model_path):
+        logging.warning(
+            f"⚠ ONNX model missing ({model_path}) — using PyTorch. "
+            "Run: python -m scripts.export_onnx"
+        )
+        return False
+    return True
+
+
+def load_embedding_model():
+    """Embedding model for the configured backend (ONNX if available, else PyTorch)."""
+    if _onnx_ready(EMBEDDING_MODEL_NAME):
+        model_dir, model_path = onnx_paths(EMBEDDING_MODEL_NAME)
+        logging.info(f"⚡ Using ONNX Runtime embeddings: {model_path}")
+        return OnnxSentenceEncoder(model_dir, model_path)
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL_NAME, device=DEVICE)
+
+
+def load_cross_encoder():
+    """Reranker model for the configured backend (ONNX if available, else PyTorch)."""
+    if _onnx_ready(RERANKER_MODEL_NAME):
+        model_dir, model_path = onnx_paths(RERANKER_MODEL_NAME)
+        logging.info(f"⚡ Using ONNX Runtime reranker: {model_path}")
+        return OnnxCrossEncoder(model_dir, model_path)
+
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(RERANKER_MODEL_NAME, max_length=RERANKER_MAX_LENGTH, device=DEVICE)
+
+
+def export_onnx_models(quantize: bool = True) -> List[str]:
+    """
+    Export the embedding model and reranker to ONNX under ONNX_MODEL_DIR
+    (plus dynamic int8 variants when `quantize`). Returns written model paths.
+    Needs torch + transformers (+ onnxruntime for quantization).
+    """
+    import torch
+    from transformers import AutoModel, AutoModelForSequenceClassification, AutoTokenizer
+
+    written = []
+    for model_name, model_cls, pair_input in (
+        (EMBEDDING_MODEL_NAME, AutoModel, False),
+        (RERANKER_MODEL_NAME, AutoModelForSequenceClassification, True),
+    ):
+        model_dir, fp32_path = onnx_paths(model_name, quantized=False)
+        os.makedirs(model_dir, exist_ok=True)
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        tokenizer.save_pretrained(model_dir)
+        model = model_cls.from_pretrained(model_name).eval()
+
+        sample = tokenizer(
+            ["what is the punishment for theft"],
+            ["Whoever commits theft shall be punished"] if pair_input else None,
+            return_tensors="pt",
+        )
+        input_names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["output"] = {0: "batch"} if pair_input else {0: "batch", 1: "sequence"}
+
+        logging.info(f"📤 Exporting {model_name} → {fp32_path}")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(sample[k] for k in input_names),
+                fp32_path,
+                input_names=input_names,
+                output_names=["output"],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+            )
+        written.append(fp32_path)
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            _, int8_path = onnx_paths(model_name, quantized=True)
+            logging.info(f"🗜 Quantizing (dynamic int8) → {int8_path}")
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+            written.append(int8_path)
+
+    return written
@@ -0,0 +1,128 @@
+# services/intent.py
+
+import json
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.embeddings import embed_query, get_embedding_model
+from config import (
+    INTENT_EXAMPLES_PATH,
+    INTENT_KNN_K,
+    INTENT_CONFIDENCE_THRESHOLD,
+    INTENT_MIN_SIMILARITY,
+)
+
+INTENT_LABELS = ("GENERAL", "LEGAL", "OFF_TOPIC", "ILLEGAL")
+
+
+@dataclass
+class IntentPrediction:
+    label: str
+    confidence: float    # similarity-weighted vote share of `label` among the k nearest examples
+    similarity: float    # cosine similarity of the nearest example
+    confident: bool      # clears INTENT_CONFIDENCE_THRESHOLD / INTENT_MIN_SIMILARITY
+
+
+def load_examples(path: str = INTENT_EXAMPLES_PATH) -> List[Dict[str, str]]:
+    """Labelled {"text", "label"} rows, one JSON object per line."""
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    unknown = {r["label"] for r in rows} - set(INTENT_LABELS)
+    if unknown:
+        raise ValueError(f"Unknown intent labels in {path}: {sorted(unknown)}")
+    return rows
+
+
+def encode_texts(texts: Sequence[str]) -> np.ndarray:
+    vectors = np.asarray(get_embedding_model().encode(list(texts), batch_size=64), dtype=np.float32)
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+class IntentClassifier:
+    """
+    k-nearest-neighbour intent classifier over MiniLM sentence embeddings of the
+    labelled examples: the k most similar examples vote, weighted by similarity.
+    A query is one matrix-vector product away from its label once embedded.
+    """
+
+    def __init__(
+        self,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        vectors: np.ndarray,
+        k: int = INTENT_KNN_K,
+        threshold: float = INTENT_CONFIDENCE_THRESHOLD,
+        min_similarity: float = INTENT_MIN_SIMILARITY,
+    ):
+        self.texts = list(texts)
+        self.labels = list(labels)
+        self.vectors = vectors
+        self.k = min(k, len(self.labels))
+        self.threshold = threshold
+        self.min_similarity = min_similarity
+
+    @classmethod
+    def from_examples(cls, rows: Sequence[Dict[str, str]], **kwargs) -> "IntentClassifier":
+        texts = [r["text"] for r in rows]
+        return cls(texts, [r["label"] for r in rows], encode_texts(texts), **kwargs)
+
+    def predict(self, query_vector: Sequence[float]) -> IntentPrediction:
+        q = np.asarray(query_vector, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        sims = self.vectors @ q
+        nearest = np.argpartition(-sims, self.k - 1)[:self.k]
+
+        votes: Dict[str, float] = defaultdict(float)
+        for i in nearest:
+            votes[self.labels[i]] += max(float(sims[i]), 0.0)
+        total = sum(votes.values())
+        label = max(votes, key=votes.get)
+        confidence = votes[label] / total if total > 0 else 0.0
+        similarity = float(sims[nearest].max())
+        return IntentPrediction(
+            label=label,
+            confidence=round(confidence, 3),
+            similarity=round(similarity, 3),
+            confident=confidence >= self.threshold and similarity >= self.min_similarity,
+        )
+
+
+# ================= Shared classifier (lazy, thread-safe) =================
+_classifier: Optional[IntentClassifier] = None
+_classifier_lock = threading.Lock()
+_unavailable = False
+
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """Classifier built from INTENT_EXAMPLES_PATH, or None if the file can't be loaded."""
+    global _classifier, _unavailable
+    if _classifier is None and not _unavailable:
+        with _classifier_lock:
+            if _classifier is None and not _unavailable:
+                try:
+                    rows = load_examples()
+                    logging.info(f"🧭 Building intent classifier from {len(rows)} examples...")
+                    _classifier = IntentClassifier.from_examples(rows)
+                except Exception as e:
+                    logging.error(f"❌ Local intent classifier unavailable: {e}")
+                    _unavailable = True
+    return _classifier
+
+
+def _mostly_latin(text: str) -> bool:
+    """MiniLM is an English model: only Latin-script (English / romanized) queries are classified locally."""
+    letters = [ch for ch in text if ch.isalpha()]
+    return bool(letters) and sum(ch.isascii() for ch in letters) / len(letters) >= 0.8
+
+
+def classify_local(query: str) -> Optional[IntentPrediction]:
+    """Local intent prediction, or None when the query can't be classified on-box."""
+    classifier = get_intent_classifier()
+    if classifier is None or not _mostly_latin(query):
+        return None
+    return classifier.predict(embed_query(query))
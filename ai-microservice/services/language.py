@@ -1,6 +1,20 @@
 # services/language.py
-from typing import Optional
-from langdetect import detect, LangDetectException
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from langdetect import DetectorFactory, detect_langs, LangDetectException
+
+from core.cache import LRUCache, content_key
+from config import LANGUAGE_ID_MODEL_PATH, LANGUAGE_ID_MIN_CONFIDENCE, LANGUAGE_DETECT_CACHE_SIZE
+
+try:
+    import fasttext
+except ImportError:  # fasttext-wheel not installed → langdetect fallback
+    fasttext = None
+
+DetectorFactory.seed = 0  # langdetect is randomized; seed it so the fallback is deterministic too
 
 
 LANG_NAME_TO_CODE = {
@@ -14,6 +28,29 @@ LANG_NAME_TO_CODE = {
     "Bengali": "bn",
     "Gujarati": "gu",
 }
+SUPPORTED_CODES = frozenset(LANG_NAME_TO_CODE.values())
+
+# The Indic Unicode blocks are 128 code points each, starting at U+0900; index → languages
+# written in that script. Devanagari is shared by Hindi and Marathi (the model decides),
+# Gurmukhi and Odia aren't supported languages.
+_INDIC_FIRST, _INDIC_LAST = 0x0900, 0x0D7F
+_INDIC_BLOCKS: Tuple[Tuple[str, ...], ...] = (
+    ("hi", "mr"),  # U+0900 Devanagari
+    ("bn",),       # U+0980 Bengali
+    (),            # U+0A00 Gurmukhi
+    ("gu",),       # U+0A80 Gujarati
+    (),            # U+0B00 Odia
+    ("ta",),       # U+0B80 Tamil
+    ("te",),       # U+0C00 Telugu
+    ("kn",),       # U+0C80 Kannada
+    ("ml",),       # U+0D00 Malayalam
+)
+_SAMPLE_CHARS = 2000  # a section's opening is enough to tell its language
+
+# normalized text → detected code ("" = nothing confident; the caller falls back)
+_detected = LRUCache(max_entries=LANGUAGE_DETECT_CACHE_SIZE)
+_counts = {"script": 0, "model": 0, "undetected": 0}
+
 
 def resolve_language_code(user_language: Optional[str]) -> str:
     """
@@ -22,7 +59,7 @@ def resolve_language_code(user_language: Optional[str]) -> str:
     """
     if not user_language:
         return "en"
-    
+
     sanitized = user_language.strip().title()  # Handles 'kannada', ' KANNADA ', etc.
 
     # Directly if it's a full name
@@ -35,29 +72,137 @@ def resolve_language_code(user_language: Optional[str]) -> str:
 
     return "en"
 
+
+# ================= fastText language-ID model (lazy, thread-safe) =================
+_model = None
+_model_lock = threading.Lock()
+_model_unavailable = False
+
+
+def get_language_model():
+    """fastText lid.176 model from LANGUAGE_ID_MODEL_PATH, or None (langdetect is used instead)."""
+    global _model, _model_unavailable
+    if _model is None and not _model_unavailable:
+        with _model_lock:
+            if _model is None and not _model_unavailable:
+                if fasttext is None or not os.path.exists(LANGUAGE_ID_MODEL_PATH):
+                    logging.warning(
+                        f"⚠ fastText language-ID model not available ({LANGUAGE_ID_MODEL_PATH}); using langdetect"
+                    )
+                    _model_unavailable = True
+                else:
+                    logging.info(f"🔤 Loading language-ID model: {LANGUAGE_ID_MODEL_PATH}")
+                    _model = fasttext.load_model(LANGUAGE_ID_MODEL_PATH)
+    return _model
+
+
+def _disable_model(error: Exception) -> None:
+    """A model that fails at predict time will keep failing: fall back to langdetect for good."""
+    global _model, _model_unavailable
+    with _model_lock:
+        if _model is not None:
+            logging.error(f"❌ fastText language-ID failed, switching to langdetect: {error}")
+        _model, _model_unavailable = None, True
+
+
+def script_languages(text: str) -> Optional[Tuple[str, ...]]:
+    """
+    Languages the dominant script of `text` allows, if at least half its letters
+    are in one Indic block (empty tuple for an unsupported script); None for
+    Latin-script or mixed text, which needs the model.
+    """
+    blocks = [0] * len(_INDIC_BLOCKS)
+    letters = 0
+    for ch in text[:_SAMPLE_CHARS]:
+        o = ord(ch)
+        if _INDIC_FIRST <= o <= _INDIC_LAST:
+            blocks[(o - _INDIC_FIRST) >> 7] += 1  # vowel signs count too; they aren't isalpha()
+            letters += 1
+        elif ch.isalpha():
+            letters += 1
+    if not letters:
+        return None
+    best = max(range(len(blocks)), key=blocks.__getitem__)
+    return _INDIC_BLOCKS[best] if blocks[best] * 2 >= letters else None
+
+
+def _predict(text: str, k: int = 3) -> List[Tuple[str, float]]:
+    """Top-k (language code, probability) from fastText, or langdetect without the model."""
+    line = " ".join(text[:_SAMPLE_CHARS].split())  # fastText predicts one line at a time
+    if not line:
+        return []
+    model = get_language_model()
+    if model is not None:
+        try:
+            labels, probs = model.predict(line, k=k)
+            return [(label.replace("__label__", ""), float(p)) for label, p in zip(labels, probs)]
+        except Exception as e:  # e.g. fasttext 0.9.2 predict() under numpy 2 (ValueError)
+            _disable_model(e)
+    try:
+        return [(c.lang, c.prob) for c in detect_langs(line)[:k]]
+    except LangDetectException:
+        return []
+
+
+def _detect(text: str) -> str:
+    candidates = script_languages(text)
+    if candidates is not None:
+        _counts["script"] += 1
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else ""
+        # Devanagari: the model's best-ranked candidate, Hindi if it has no opinion
+        ranked = [code for code, _ in _predict(text, k=10) if code in candidates]
+        return ranked[0] if ranked else candidates[0]
+
+    ranked = _predict(text)
+    if ranked and ranked[0][0] in SUPPORTED_CODES and ranked[0][1] >= LANGUAGE_ID_MIN_CONFIDENCE:
+        _counts["model"] += 1
+        return ranked[0][0]
+    _counts["undetected"] += 1
+    return ""
+
+
+def detect_text_language(text: str) -> Optional[str]:
+    """
+    Supported language code `text` is written in, or None if it can't be told
+    with confidence. Deterministic, and cached per text.
+    """
+    key = content_key(" ".join(text.split()))
+    code = _detected.get(key)
+    if code is None:
+        code = _detect(text)
+        _detected.set(key, code)
+    return code or None
+
+
 def detect_language(text: str, user_language: Optional[str] = None) -> str:
     """
-    Detects language preference from text keywords first, then user profile.
+    Detects language preference from text keywords first, then the text itself, then user profile.
     """
     text_lower = text.lower()
-    
+
     # Check for explicit instructions like "in hindi", "in tamil"
     for name, code in LANG_NAME_TO_CODE.items():
         if f"in {name.lower()}" in text_lower:
             print(f"🌍 Language Detected via keyword: {code}")
             return code
 
-    # Fallback to langdetect for native script inputs (e.g. Hindi text)
-    try:
-        detected = detect(text)
-        if detected in LANG_NAME_TO_CODE.values():
-            print(f"🌍 Language Detected via script: {detected}")
-            return detected
-    except LangDetectException:
-        pass
+    # Native script (Unicode block), else fastText language ID
+    detected = detect_text_language(text)
+    if detected:
+        print(f"🌍 Language Detected via script: {detected}")
+        return detected
 
     final = resolve_language_code(user_language)
     print(f"🌍 Language Default/Profile: {final}")
     if not final or final.strip() == "":
         return "en"
     return final
+
+
+def language_stats() -> Dict[str, Any]:
+    return {
+        "backend": "fasttext" if _model is not None else ("langdetect" if _model_unavailable else "not loaded"),
+        **_counts,
+        "cache": _detected.stats,
+    }
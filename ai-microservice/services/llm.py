@@ -1,11 +1,36 @@
 # services/llm.py
 
+import asyncio
 import json
-import requests
-from typing import List, Dict, Any, Optional
-
-from config import GROQ_API_KEY, GROQ_API_URL, GROQ_MODEL_NAME
+import logging
+import httpx
+from typing import AsyncIterator, List, Dict, Any, Optional
+
+from config import (
+    GROQ_API_KEY,
+    GROQ_API_URL,
+    GROQ_MODEL_NAME,
+    GROQ_HTTP2,
+    GROQ_MAX_CONNECTIONS,
+    GROQ_MAX_KEEPALIVE,
+    GROQ_KEEPALIVE_EXPIRY,
+    GROQ_CONNECT_TIMEOUT,
+    GROQ_READ_TIMEOUT,
+    INTENT_LOCAL_CLASSIFIER,
+)
 from core.validation import ValidationResult
+from services.context import format_context
+from services.intent import classify_local
+
+# HTTP/2 needs the optional `h2` package (httpx[http2]); fall back to HTTP/1.1 keep-alive
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# Shared pooled client, created lazily inside the running event loop
+_client: Optional[httpx.AsyncClient] = None
 
 
 
@@ -22,7 +47,39 @@ SCRIPT_INSTRUCTIONS = {
     "en": "English Language",
 }
 
-def _groq_chat(
+def _get_groq_client() -> httpx.AsyncClient:
+    """
+    Return the shared Groq HTTP client, creating it on first use.
+    One pooled client keeps TCP/TLS connections alive across requests
+    instead of paying a fresh handshake for every completion.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=GROQ_HTTP2 and _HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(GROQ_READ_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=GROQ_MAX_KEEPALIVE,
+                keepalive_expiry=GROQ_KEEPALIVE_EXPIRY,
+            ),
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json",
+            },
+        )
+    return _client
+
+
+async def close_groq_client() -> None:
+    """Close the shared Groq client (called on app shutdown)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+async def _groq_chat(
     messages: List[Dict[str, str]],
     max_tokens: int = 800,
     temperature: float = 0.2,
@@ -39,11 +96,6 @@ def _groq_chat(
         print("⚠ GROQ_API_KEY not set. Skipping LLM call.")
         return None
 
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
         "model": GROQ_MODEL_NAME,
         "messages": messages,
@@ -54,7 +106,7 @@ def _groq_chat(
     }
 
     try:
-        resp = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=40)
+        resp = await _get_groq_client().post(GROQ_API_URL, json=payload)
         
         if resp.status_code != 200:
             print(f"⚠ Groq API Error ({resp.status_code}): {resp.text}")
@@ -68,11 +120,81 @@ def _groq_chat(
         return None
 
 
-def classify_intent(query: str) -> str:
+class LLMStreamError(Exception):
+    """A Groq stream that failed after it had started: the text received so far is incomplete."""
+
+
+async def _groq_chat_stream(
+    messages: List[Dict[str, str]],
+    max_tokens: int = 800,
+    temperature: float = 0.2,
+    presence_penalty: float = 0.0,
+    frequency_penalty: float = 0.0,
+) -> AsyncIterator[str]:
+    """
+    Stream a chat completion from Groq (OpenAI-compatible SSE).
+    Yields content deltas as they arrive. Stops quietly if the request fails
+    before any content; raises LLMStreamError if it breaks off mid-answer.
+    """
+    if not GROQ_API_KEY:
+        print("⚠ GROQ_API_KEY not set. Skipping LLM call.")
+        return
+
+    payload = {
+        "model": GROQ_MODEL_NAME,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "presence_penalty": presence_penalty,
+        "frequency_penalty": frequency_penalty,
+        "stream": True,
+    }
+
+    started = done = False
+    try:
+        async with _get_groq_client().stream("POST", GROQ_API_URL, json=payload) as resp:
+            if resp.status_code != 200:
+                body = await resp.aread()
+                print(f"⚠ Groq API Error ({resp.status_code}): {body.decode(errors='replace')}")
+                return
+
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    done = True
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    started = True
+                    yield delta
+
+    except Exception as e:
+        print(f"🚨 Groq API Exception: {str(e)}")
+        if started:
+            raise LLMStreamError(str(e)) from e
+        return
+
+    if started and not done:
+        raise LLMStreamError("stream ended without [DONE]")
+
+
+# Risk heuristics shared by classify_intent and the local grounding validator (services/grounding.py)
+EVASION_PHRASES = ["how to escape", "how do i avoid", "how to get away", "how to hide evidence", "destroy evidence", "how to commit"]
+VIOLENCE_WORDS = ["kill", "murder", "hurt someone to"]
+# First-person intent only: "suicide" / "self-harm" alone are common in legal-awareness
+# questions (abetment of suicide, dowry death) and only make the local verdict uncertain
+SELF_HARM_PHRASES = ["kill myself", "end my life", "want to die", "hurt myself", "take my own life"]
+SELF_HARM_TOPICS = ["suicide", "self harm", "self-harm"]
+
+
+async def classify_intent(query: str) -> str:
     """
     Classifies user query into: GENERAL, LEGAL, OFF_TOPIC, ILLEGAL
     Improved: quick local heuristics for very short greetings / general queries,
-    then fall back to GROQ. This reduces misclassification of casual greetings
+    then the on-box classifier (services/intent.py), then fall back to GROQ
+    only for queries it isn't confident about. This reduces misclassification of casual greetings
     (e.g., "hi", "who are you", "what can you do") that previously triggered
     RAG or legal pipelines.
     """
@@ -99,10 +221,19 @@ def classify_intent(query: str) -> str:
             return "GENERAL"
 
     # refuse clearly illegal intents deterministically if they mention escape / evade
-    illegal_phrases = ["how to escape", "how do i avoid", "how to get away", "how to hide evidence", "destroy evidence", "kill", "murder", "hurt someone to", "how to commit"]
-    if any(p in q for p in illegal_phrases):
+    if any(p in q for p in EVASION_PHRASES + VIOLENCE_WORDS):
         return "ILLEGAL"
 
+    # --- ON-BOX CLASSIFIER (kNN over MiniLM embeddings, ~1 ms once the query is embedded) ---
+    local = None
+    if INTENT_LOCAL_CLASSIFIER:
+        try:
+            local = await asyncio.to_thread(classify_local, query)
+        except Exception as e:
+            logging.error(f"❌ Local intent classification failed: {e}")
+        if local is not None and local.confident:
+            return local.label
+
     # If GROQ key not set, conservative fallback to LEGAL to ensure safety for user queries
     if not GROQ_API_KEY:
         return "LEGAL"
@@ -127,54 +258,19 @@ def classify_intent(query: str) -> str:
     ]
 
     # Quick classification using Groq
-    resp = _groq_chat(msgs, max_tokens=12, temperature=0.0)
+    resp = await _groq_chat(msgs, max_tokens=12, temperature=0.0)
     if not resp:
-        # If LLM fails (e.g. rate limit), return API_ERROR to prevent further pipeline failures
-        return "API_ERROR"
+        # If LLM fails (e.g. rate limit), fall back to the local guess; without one,
+        # return API_ERROR to prevent further pipeline failures
+        return local.label if local is not None else "API_ERROR"
 
     intent = resp.upper().strip()
     if intent not in ["GENERAL", "LEGAL", "OFF_TOPIC", "ILLEGAL"]:
         return "LEGAL"
     return intent
 
-    """
-    Classifies user query into: GENERAL, LEGAL, OFF_TOPIC, ILLEGAL
-    """
-    if not GROQ_API_KEY:
-        return "LEGAL"  # Fallback
 
-    system = (
-        "You are an intent classifier for a legal AI assistant.\n\n"
-        "Classify the user query into exactly ONE of the following:\n\n"
-        "GENERAL → greetings, who are you, what can you do, thanks, small talk\n"
-        "LEGAL → laws, crimes, punishments, FIR, disputes, money, property, family conflicts, violence, police, court\n"
-        "OFF_TOPIC → coding, math, cooking, movies, sports, jokes, random facts\n"
-        "ILLEGAL → escaping crime, harming someone, fraud tactics\n\n"
-        "Rules:\n"
-        "- Any real-world problem involving money/property/violence/disputes = LEGAL\n"
-        "- Instructions to escape law = ILLEGAL\n"
-        "- Respond ONLY with one word from: GENERAL, LEGAL, OFF_TOPIC, ILLEGAL"
-    )
-
-    msgs = [
-        {"role": "system", "content": system},
-        {"role": "user", "content": query}
-    ]
-
-    # Quick classification
-    resp = _groq_chat(msgs, max_tokens=10, temperature=0.0)
-    if not resp:
-        return "LEGAL"
-    
-    intent = resp.upper().strip()
-    # Sanity check
-    if intent not in ["GENERAL", "LEGAL", "OFF_TOPIC", "ILLEGAL"]:
-        return "LEGAL"
-        
-    return intent
-
-
-def chat_general(query: str) -> Optional[str]:
+async def chat_general(query: str) -> Optional[str]:
     """
     Handles GENERAL queries (greetings, about me)
     """
@@ -197,29 +293,20 @@ def chat_general(query: str) -> Optional[str]:
     ]
 
     # User requested huge limit ("infinity") -> using 4096 which is practical max
-    return _groq_chat(msgs, temperature=0.4, max_tokens=4096)
+    return await _groq_chat(msgs, temperature=0.4, max_tokens=4096)
 
 
-def generate_answer(
+def _answer_messages(
     query: str,
     sections: List[Dict[str, Any]],
     explanation_mode: str,
     state: str,
     target_language: str = "en",
-) -> Optional[str]:
+) -> List[Dict[str, str]]:
     """
-    Phase 1: Generate an answer grounded ONLY in the retrieved legal sections.
-    - If user asks how to commit a crime or avoid punishment → must refuse.
-    - If context insufficient → must say so and recommend consulting a lawyer.
+    Build the grounded-answer prompt shared by generate_answer and generate_answer_stream.
     """
-    if not GROQ_API_KEY:
-        print("⚠ GROQ_API_KEY not set. Skipping answer generation.")
-        return None
-
-    context_text = "\n\n".join(
-        f"Act: {s['act']}\nSection: {s['section']}\nText: {s['text']}\n---"
-        for s in sections
-    )
+    context_text = format_context(sections)
 
     style_instruction = (
         "Explain in clear, simple legal language suitable for an adult without a law background."
@@ -276,17 +363,58 @@ def generate_answer(
         f"RESPOND STRICTLY IN ENGLISH."
     )
 
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt},
     ]
 
+
+async def generate_answer(
+    query: str,
+    sections: List[Dict[str, Any]],
+    explanation_mode: str,
+    state: str,
+    target_language: str = "en",
+) -> Optional[str]:
+    """
+    Phase 1: Generate an answer grounded ONLY in the retrieved legal sections.
+    - If user asks how to commit a crime or avoid punishment → must refuse.
+    - If context insufficient → must say so and recommend consulting a lawyer.
+    """
+    if not GROQ_API_KEY:
+        print("⚠ GROQ_API_KEY not set. Skipping answer generation.")
+        return None
+
+    messages = _answer_messages(query, sections, explanation_mode, state, target_language)
+
     # User requested huge limit ("infinity") -> using 4096 which is practical max
     # Added presence_penalty and frequency_penalty to prevent loops
-    return _groq_chat(messages, max_tokens=4096, presence_penalty=0.6, frequency_penalty=0.5)
+    return await _groq_chat(messages, max_tokens=4096, presence_penalty=0.6, frequency_penalty=0.5)
 
 
-def validate_answer(
+async def generate_answer_stream(
+    query: str,
+    sections: List[Dict[str, Any]],
+    explanation_mode: str,
+    state: str,
+    target_language: str = "en",
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of generate_answer: yields the English draft chunk by chunk.
+    Yields nothing if the LLM is unavailable (caller treats that like None);
+    raises LLMStreamError if the stream breaks off part-way.
+    """
+    if not GROQ_API_KEY:
+        print("⚠ GROQ_API_KEY not set. Skipping answer generation.")
+        return
+
+    messages = _answer_messages(query, sections, explanation_mode, state, target_language)
+
+    async for token in _groq_chat_stream(messages, max_tokens=4096, presence_penalty=0.6, frequency_penalty=0.5):
+        yield token
+
+
+async def validate_answer(
     answer: str,
     sections: List[Dict[str, Any]],
     query: str,
@@ -306,10 +434,7 @@ def validate_answer(
         print("⚠ Validation skipped – missing API key or answer.")
         return ValidationResult(is_valid=False, confidence=0.0, high_risk=False)
 
-    context_text = "\n\n".join(
-        f"Act: {s['act']}\nSection: {s['section']}\nText: {s['text']}\n---"
-        for s in sections
-    )
+    context_text = format_context(sections)
 
     system_prompt = (
     "You are a safety and grounding validator for a legal information assistant in India.\n\n"
@@ -347,7 +472,7 @@ def validate_answer(
         {"role": "user", "content": user_prompt},
     ]
 
-    raw = _groq_chat(messages, max_tokens=250, temperature=0.0)
+    raw = await _groq_chat(messages, max_tokens=250, temperature=0.0)
 
     if not raw:
         return ValidationResult(is_valid=False, confidence=0.0, high_risk=False)
@@ -1,26 +1,83 @@
 # services/rerank.py
 
-from typing import List, Dict, Any, Optional
-from sentence_transformers import CrossEncoder
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 import logging
+import threading
 
-# Best practice: lazy load model once
-RERANKER_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
-_cross_encoder: Optional[CrossEncoder] = None
+from core.batching import MicroBatcher
+from core.cache import LRUCache, content_key
+from services.inference import load_cross_encoder
+from config import (
+    RERANKER_BATCH_SIZE,
+    RERANKER_MAX_BATCH_PAIRS,
+    RERANKER_BATCH_MAX_WAIT_MS,
+    RERANKER_CACHE_SIZE,
+)
 
+# Best practice: lazy load model once (locked so concurrent first requests load it only once)
+_cross_encoder = None  # CrossEncoder or OnnxCrossEncoder
+_load_lock = threading.Lock()
 
-def get_reranker_model() -> CrossEncoder:
+
+def get_reranker_model():
     global _cross_encoder
     if _cross_encoder is None:
-        logging.info("🧠 Loading CrossEncoder model for reranking...")
-        try:
-            _cross_encoder = CrossEncoder(RERANKER_MODEL_NAME)
-        except Exception as e:
-            logging.error(f"❌ Failed to load CrossEncoder model: {e}")
-            raise
+        with _load_lock:
+            if _cross_encoder is None:
+                logging.info("🧠 Loading CrossEncoder model for reranking...")
+                try:
+                    _cross_encoder = load_cross_encoder()
+                except Exception as e:
+                    logging.error(f"❌ Failed to load CrossEncoder model: {e}")
+                    raise
     return _cross_encoder
 
 
+def _score_pairs(pairs: List[Tuple[str, str]]) -> Sequence[float]:
+    return get_reranker_model().predict(pairs, batch_size=RERANKER_BATCH_SIZE)
+
+
+# Pairs from concurrent requests are scored together in one predict() call
+_pair_batcher = MicroBatcher(
+    _score_pairs,
+    max_batch_size=RERANKER_MAX_BATCH_PAIRS,
+    max_wait_ms=RERANKER_BATCH_MAX_WAIT_MS,
+    name="reranker-batcher",
+)
+
+# (query hash, section id) → cross-encoder score; repeated/paginated queries skip rescoring
+_pair_scores = LRUCache(max_entries=RERANKER_CACHE_SIZE)
+
+
+def _section_key(section: Dict[str, Any]) -> str:
+    return section.get("id") or content_key(section["text"])
+
+
+def score_sections(query: str, sections: List[Dict[str, Any]]) -> List[float]:
+    """
+    Cross-encoder relevance scores for (query, section) pairs, using the pair-score
+    cache and the shared batching queue for anything not cached yet.
+    """
+    query_key = content_key(query)
+    keys = [(query_key, _section_key(s)) for s in sections]
+    scores: List[Optional[float]] = [_pair_scores.get(k) for k in keys]
+
+    pending = [
+        (i, _pair_batcher.submit((query, s["text"])))
+        for i, s in enumerate(sections)
+        if scores[i] is None
+    ]
+    for i, future in pending:
+        scores[i] = float(future.result())
+        _pair_scores.set(keys[i], scores[i])
+
+    return scores
+
+
+def reranker_stats() -> Dict[str, Any]:
+    return {"pair_cache": _pair_scores.stats, "batches": _pair_batcher.stats}
+
+
 def rerank_sections(query: str, sections: List[Dict[str, Any]], top_k: int = 5) -> List[Dict[str, Any]]:
     """
     Rerank retrieved sections using cross-encoder scores.
@@ -29,11 +86,8 @@ def rerank_sections(query: str, sections: List[Dict[str, Any]], top_k: int = 5)
     if not sections:
         return sections
 
-    model = get_reranker_model()
-
     try:
-        pairs = [(query, s["text"]) for s in sections]
-        scores = model.predict(pairs)
+        scores = score_sections(query, sections)
     except Exception as e:
         logging.error(f"⚠ Error during reranking: {e}")
         return sections  # fallback – return original sections
@@ -45,4 +99,3 @@ def rerank_sections(query: str, sections: List[Dict[str, Any]], top_k: int = 5)
     ranked = [s for s, _ in scored[:top_k]]
     logging.info(f"📊 Reranked {len(sections)} → top {top_k} sections")
     return ranked
-
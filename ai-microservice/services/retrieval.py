@@ -0,0 +1,101 @@
+# services/retrieval.py
+
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.bm25 import BM25Index
+from core.metrics import LatencyTracker
+from services.embeddings import fetch_sections, retrieve_sections
+from services.vector_store import CENTRAL_STATES
+from config import (
+    HYBRID_RETRIEVAL,
+    BM25_INDEX_DIR,
+    RRF_K,
+    HYBRID_CANDIDATES,
+    RETRIEVAL_TOP_K,
+)
+
+# BM25 index is memory-mapped lazily and reloaded when ingest rewrites it
+_bm25: Optional[BM25Index] = None
+_bm25_mtime = 0.0
+_bm25_lock = threading.Lock()
+
+# Per-component retrieval latency (dense / bm25 / fusion / fetch / total)
+_latency = LatencyTracker()
+
+
+def get_bm25_index() -> Optional[BM25Index]:
+    """Shared BM25 index, or None if it hasn't been built (dense-only retrieval)."""
+    global _bm25, _bm25_mtime
+    meta_path = os.path.join(BM25_INDEX_DIR, "meta.json")
+    try:
+        mtime = os.path.getmtime(meta_path)
+    except OSError:
+        return None
+
+    if _bm25 is None or mtime != _bm25_mtime:
+        with _bm25_lock:
+            if _bm25 is None or mtime != _bm25_mtime:
+                logging.info("🔤 Loading BM25 index...")
+                _bm25 = BM25Index.load(BM25_INDEX_DIR)
+                _bm25_mtime = mtime
+    return _bm25
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score(d) = Σ 1 / (k + rank). Highest first."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+
+def hybrid_retrieve(
+    query: str,
+    state: str,
+    top_k: int = RETRIEVAL_TOP_K,
+    query_embedding: Optional[Sequence[float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Dense (vector store) + lexical (BM25) retrieval fused with reciprocal rank fusion.
+    Same inputs/outputs as retrieve_sections; falls back to dense-only when
+    hybrid retrieval is disabled or no BM25 index has been built.
+    """
+    if not query:
+        return []
+
+    with _latency.time("total"):
+        bm25 = get_bm25_index() if HYBRID_RETRIEVAL else None
+        depth = max(top_k, HYBRID_CANDIDATES) if bm25 is not None else top_k
+
+        with _latency.time("dense"):
+            dense = retrieve_sections(query, state, top_k=depth, query_embedding=query_embedding)
+        if bm25 is None:
+            return dense
+
+        with _latency.time("bm25"):
+            lexical = bm25.search(query, top_k=depth, states=[state, *CENTRAL_STATES] if state else None)
+
+        with _latency.time("fusion"):
+            fused = reciprocal_rank_fusion([[d["id"] for d in dense], [doc_id for doc_id, _ in lexical]])
+            top_ids = [doc_id for doc_id, _ in fused[:top_k]]
+
+        by_id = {d["id"]: d for d in dense}
+        missing = [doc_id for doc_id in top_ids if doc_id not in by_id]
+        if missing:
+            with _latency.time("fetch"):
+                by_id.update(fetch_sections(missing, state))
+
+    return [by_id[doc_id] for doc_id in top_ids if doc_id in by_id]
+
+
+def retrieval_stats() -> Dict[str, Any]:
+    bm25 = get_bm25_index() if HYBRID_RETRIEVAL else None
+    return {
+        "hybrid": bm25 is not None,
+        "bm25_docs": len(bm25) if bm25 is not None else 0,
+        "latency": _latency.stats,
+    }
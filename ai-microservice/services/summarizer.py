@@ -1,15 +1,30 @@
 # services/summarizer.py
 
+import asyncio
+from typing import Optional
+
 from services.llm import _groq_chat
+from services.translation import translate_to_english, translate_from_english_async
+from services.language import detect_text_language
+from core.cache import SingleFlight, TieredCache, content_key
+from config import SUMMARY_CACHE_DB, SUMMARY_CACHE_SIZE
 
-def summarize_text(text: str) -> str:
-    """
-    Generates a clean, readable legal summary WITHOUT markdown, stars, or bullets.
-    """
+SHORT_TEXT_MESSAGE = "The selected legal text is too short to generate a meaningful explanation."
+UNAVAILABLE_MESSAGE = (
+    "A clear explanation is currently unavailable. "
+    "Please consult a legal expert."
+)
 
-    if not text or len(text.strip()) < 80:
-        return "The selected legal text is too short to generate a meaningful explanation."
+# English summaries and their localized variants, keyed on (normalized section text, language).
+# The section set is fixed, so popular sections are summarized once and then served from here.
+_summaries = TieredCache("summaries", max_entries=SUMMARY_CACHE_SIZE, path=SUMMARY_CACHE_DB)
+_inflight = SingleFlight()
 
+
+async def _summarize(text: str) -> Optional[str]:
+    """
+    Ask Groq for a plain-text explanation of a legal section. None on failure.
+    """
     system_prompt = (
         "You are a legal explainer for Indian law.\n\n"
         "Your task:\n"
@@ -29,16 +44,67 @@ def summarize_text(text: str) -> str:
         {"role": "user", "content": user_prompt},
     ]
 
-    result = _groq_chat(
+    result = await _groq_chat(
         messages,
         max_tokens=500,
         temperature=0.2,
     )
 
-    if not result:
-        return (
-            "A clear explanation is currently unavailable. "
-            "Please consult a legal expert."
-        )
+    return result.strip() if result else None
+
+
+async def summarize_section(raw_text: str, user_language: str) -> str:
+    """
+    Cached summary of a legal section in `user_language` (a resolved code like "kn").
+
+    The English summary is cached separately from localized variants, so a new
+    language costs one translation, not another Groq call. Concurrent requests
+    for the same section/language share a single computation.
+    """
+    normalized = " ".join(raw_text.split())
+    key_en = content_key("summary", "en", normalized)
+
+    # Cache reads/writes may hit SQLite and language ID may run a model: off the event loop
+    async def english() -> Optional[str]:
+        cached = await asyncio.to_thread(_summaries.get, key_en)
+        if cached is not None:
+            return cached
+        # STEP 1 — convert section to English (most sections already are: no translator call)
+        if await asyncio.to_thread(detect_text_language, raw_text) == "en":
+            text_en = raw_text
+        else:
+            text_en = await asyncio.to_thread(translate_to_english, raw_text, "auto")
+        if len(text_en.strip()) < 80:
+            return SHORT_TEXT_MESSAGE
+        # STEP 2 — summarize in stable English
+        summary = await _summarize(text_en)
+        if summary:
+            await asyncio.to_thread(_summaries.set, key_en, summary)
+        return summary
+
+    summary_en = await _inflight.do(key_en, english) or UNAVAILABLE_MESSAGE
+
+    # STEP 3 — translate ONLY if language != en
+    if user_language.lower() == "en":
+        return summary_en
+
+    if summary_en in (SHORT_TEXT_MESSAGE, UNAVAILABLE_MESSAGE):
+        # canned messages: the translation cache already covers these
+        return await translate_from_english_async(summary_en, user_language)
+
+    key_local = content_key("summary", user_language.lower(), normalized)
+
+    async def localized() -> str:
+        cached = await asyncio.to_thread(_summaries.get, key_local)
+        if cached is not None:
+            return cached
+        summary_local = await translate_from_english_async(summary_en, user_language)
+        if summary_local and summary_local != summary_en:  # don't cache translator fallbacks
+            await asyncio.to_thread(_summaries.set, key_local, summary_local)
+        return summary_local
+
+    return await _inflight.do(key_local, localized)
+
 
-    return result.strip()
+def summary_cache_stats():
+    return _summaries.stats
@@ -1,7 +1,60 @@
 # services/translation.py
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
 from deep_translator import GoogleTranslator
 from services.language import resolve_language_code
+from core.cache import LRUCache, TieredCache, content_key
+from config import (
+    TRANSLATION_CACHE_DB,
+    TRANSLATION_CACHE_SIZE,
+    TRANSLATION_CONCURRENCY,
+    TRANSLATION_JOB_TTL,
+)
+
+CHUNK_SIZE = 4000
+
+# Content-addressed cache: (source, target, sha256(text)) → translation.
+# Section texts, canned refusals and disclaimers repeat constantly.
+_cache = TieredCache("translations", max_entries=TRANSLATION_CACHE_SIZE, path=TRANSLATION_CACHE_DB)
+
+
+def _cached_translate(text: str, source: str, target: str) -> str:
+    """
+    Translate via GoogleTranslator, consulting the cache first.
+    Raises on translator failure (failures are never cached).
+    """
+    key = content_key(source, target, text)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    translator = GoogleTranslator(source=source, target=target)
+    if len(text) <= CHUNK_SIZE:
+        translated = translator.translate(text)
+    else:
+        chunks = [text[i:i+CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+        translated = "".join(translator.translate(chunk) for chunk in chunks)
+
+    translated = (translated or "").strip()
+    if translated:
+        _cache.set(key, translated)
+    return translated
+
+
+def translation_cache_stats() -> Dict[str, int]:
+    return _cache.stats
+
+
+def cached_translation(text: str, target_lang_code: str) -> Optional[str]:
+    """English → target translation if already cached (no network), else None."""
+    target_lang_code = resolve_language_code(target_lang_code)
+    if target_lang_code == "en":
+        return text.strip()
+    return _cache.get(content_key("en", target_lang_code, text))
+
 
 def translate_to_english(text: str, src_lang_code: str) -> str:
     """
@@ -11,8 +64,7 @@ def translate_to_english(text: str, src_lang_code: str) -> str:
         return text.strip()
 
     try:
-        translator = GoogleTranslator(source="auto", target="en")
-        return translator.translate(text).strip()
+        return _cached_translate(text, "auto", "en")
     except Exception:
         return text.strip()
 
@@ -33,18 +85,59 @@ def translate_from_english(text: str, target_lang_code: str) -> str:
         return text.strip()
 
     try:
-        CHUNK_SIZE = 4000
-
-        if len(text) <= CHUNK_SIZE:
-            translator = GoogleTranslator(source="en", target=target_lang_code)
-            return translator.translate(text).strip()
-
-        chunks = [text[i:i+CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
-        translator = GoogleTranslator(source="en", target=target_lang_code)
-        translated = [translator.translate(chunk) for chunk in chunks]
-
-        return "".join(translated).strip()
+        return _cached_translate(text, "en", target_lang_code)
 
     except Exception as e:
         print(f"Translation Error: {e}")
         return text.strip()
+
+
+# ======================= Concurrent / background translation =======================
+
+# Dedicated pool: bounds simultaneous translator round trips across all requests in this worker
+_executor = ThreadPoolExecutor(max_workers=TRANSLATION_CONCURRENCY, thread_name_prefix="translate")
+
+# Background translation jobs handed out to clients: translation_id → asyncio.Task
+_jobs = LRUCache(max_entries=5000, ttl=TRANSLATION_JOB_TTL)
+
+
+async def translate_from_english_async(text: str, target_lang_code: str) -> str:
+    """translate_from_english in a worker thread, limited by the shared concurrency bound."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, translate_from_english, text, target_lang_code)
+
+
+async def translate_many_from_english(texts: List[str], target_lang_code: str) -> List[str]:
+    """Translate several texts concurrently (bounded), preserving order."""
+    return list(await asyncio.gather(
+        *(translate_from_english_async(t, target_lang_code) for t in texts)
+    ))
+
+
+def submit_translation(text: str, target_lang_code: str) -> str:
+    """
+    Start translating in the background and return a handle for get_translation().
+    Identical (text, language) submissions share one job.
+    """
+    target_lang_code = resolve_language_code(target_lang_code)
+    translation_id = content_key("en", target_lang_code, text)
+    if _jobs.get(translation_id) is None:
+        _jobs.set(
+            translation_id,
+            asyncio.ensure_future(translate_from_english_async(text, target_lang_code)),
+        )
+    return translation_id
+
+
+async def get_translation(translation_id: str, timeout: Optional[float] = None) -> Optional[str]:
+    """
+    Wait (up to `timeout` seconds) for a submitted translation.
+    Returns None if the job is still running; raises KeyError for unknown/expired handles.
+    """
+    job = _jobs.get(translation_id)
+    if job is None:
+        raise KeyError(translation_id)
+    try:
+        return await asyncio.wait_for(asyncio.shield(job), timeout)
+    except asyncio.TimeoutError:
+        return None
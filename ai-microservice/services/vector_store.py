@@ -0,0 +1,391 @@
+# services/vector_store.py
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.snapshot import SECTIONS_FILE, load_snapshot
+from config import (
+    CHROMA_DB_DIR,
+    EMBEDDING_MODEL_NAME,
+    VECTOR_STORE,
+    VECTOR_SNAPSHOT_DIR,
+    PARTITION_SEARCH_WORKERS,
+)
+
+COLLECTION_NAME = "legal_sections"
+# Central acts: PDFs are tagged state="India", the HF "central" split state="Central"
+CENTRAL_STATES = ("India", "Central")
+
+
+def partition_name(state: Optional[str], jurisdiction: Optional[str] = None) -> str:
+    """
+    Index partition of a section: one for central acts, one per state.
+    Also a valid Chroma collection name ("legal_sections_central", "legal_sections_tamil_nadu").
+    """
+    if jurisdiction == "central" or not state or state in CENTRAL_STATES:
+        return f"{COLLECTION_NAME}_central"
+    slug = re.sub(r"[^a-z0-9]+", "_", state.lower()).strip("_")
+    return f"{COLLECTION_NAME}_{slug}"[:63].rstrip("_")
+
+
+CENTRAL_PARTITION = partition_name(None)
+
+
+def search_partitions(state: Optional[str]) -> List[str]:
+    """Partitions a query from `state` searches: central acts + that state's acts."""
+    names = [CENTRAL_PARTITION]
+    if state and partition_name(state) != CENTRAL_PARTITION:
+        names.append(partition_name(state))
+    return names
+
+
+def open_chroma_client(path: str = CHROMA_DB_DIR, allow_reset: bool = False):
+    import chromadb
+    from chromadb.config import Settings
+
+    return chromadb.PersistentClient(path=path, settings=Settings(allow_reset=allow_reset))
+
+
+def list_partitions(client) -> Dict[str, Any]:
+    """Partition collections in a Chroma client: name → collection."""
+    names = [getattr(c, "name", c) for c in client.list_collections()]
+    return {
+        name: client.get_collection(name)
+        for name in sorted(names)
+        if name.startswith(f"{COLLECTION_NAME}_")
+    }
+
+
+def index_collections(client) -> List[Any]:
+    """Every collection holding sections: the partitions, or an unpartitioned legacy index."""
+    partitions = list_partitions(client)
+    if partitions:
+        return list(partitions.values())
+    names = [getattr(c, "name", c) for c in client.list_collections()]
+    return [client.get_collection(COLLECTION_NAME)] if COLLECTION_NAME in names else []
+
+
+def to_section_doc(doc_id: str, text: str, metadata: Dict) -> Dict:
+    """Stored row → section dict returned by all retrieval paths."""
+    return {
+        "id": doc_id,
+        "text": text,
+        "act": metadata.get("act"),
+        "section": metadata.get("section"),
+        "jurisdiction": metadata.get("jurisdiction"),
+        "state": metadata.get("state"),
+        "sourceLink": metadata.get("source_link") or metadata.get("sourceLink"),
+        "parent_id": metadata.get("parent_id"),
+        "chunk_index": metadata.get("chunk_index", 0),
+    }
+
+
+class VectorStore:
+    """
+    Section vector index used by retrieval, the citation index and the answer
+    cache. Implementations: ChromaVectorStore (HNSW, on-disk) and
+    NumpyVectorStore (exact search over a memory-mapped snapshot).
+    """
+
+    name = "base"
+
+    def search(self, embedding: Sequence[float], top_k: int, state: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top-k section dicts by similarity, limited to central acts + `state`'s acts."""
+        raise NotImplementedError
+
+    def get(self, ids: Sequence[str], state: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Section dicts for `ids` (unknown ids are skipped); `state` hints where to look first."""
+        raise NotImplementedError
+
+    def iter_metadata(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(id, metadata) for every stored section, without texts or vectors."""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def fingerprint(self) -> str:
+        """Cheap identifier that changes whenever the indexed contents change."""
+        raise NotImplementedError
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    One Chroma collection per partition (see partition_name). A query searches
+    the central and the user's state partition concurrently and merges the hits
+    by distance, so its cost doesn't grow with the number of other states.
+    An index from before partitioning (a single "legal_sections" collection) is
+    still served, with the old state metadata filter, until it is re-ingested.
+    """
+
+    name = "chroma"
+
+    # fingerprint() is called per LEGAL query (answer cache key); listing and counting
+    # every partition is only redone this often
+    _FINGERPRINT_TTL_SECONDS = 30
+
+    def __init__(self, path: str = CHROMA_DB_DIR):
+        logging.info("📂 Opening Chroma index...")
+        self.path = path
+        self.client = open_chroma_client(path)
+        self._refresh_lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
+        self._fingerprint_at = 0.0
+        self._refresh()
+        if self.legacy is not None:
+            logging.warning("⚠ Unpartitioned Chroma index — re-run scripts/ingest.py to split it by state.")
+
+    @property
+    def partitions(self) -> Dict[str, Any]:
+        return self._layout[0]
+
+    @property
+    def legacy(self):
+        return self._layout[1]
+
+    def _refresh(self) -> None:
+        partitions = list_partitions(self.client)
+        collections = index_collections(self.client) if not partitions else []
+        # One assignment: searches running on _search_pool see either the old or the new layout
+        self._layout = (partitions, collections[0] if collections else None)
+
+    def _collections(self, state: Optional[str] = None) -> List[Any]:
+        partitions, legacy = self._layout
+        if legacy is not None:
+            return [legacy]
+        if state is None:
+            return list(partitions.values())
+        return [partitions[n] for n in search_partitions(state) if n in partitions]
+
+    @staticmethod
+    def _query(collection, embedding: List[float], top_k: int, where=None) -> List[Tuple[float, Dict]]:
+        results = collection.query(
+            query_embeddings=[embedding],
+            n_results=top_k,
+            where=where,
+            include=["documents", "metadatas", "distances"],
+        )
+        return [
+            (distance, to_section_doc(doc_id, text, metadata or {}))
+            for doc_id, text, metadata, distance in zip(
+                results["ids"][0],
+                results["documents"][0],
+                results["metadatas"][0],
+                results["distances"][0]
+            )
+        ]
+
+    def search(self, embedding, top_k, state=None):
+        embedding = np.asarray(embedding, dtype=np.float32).tolist()
+        legacy = self.legacy
+        if legacy is not None:
+            where = {"$or": [{"state": state}] + [{"state": s} for s in CENTRAL_STATES]} if state else None
+            return [doc for _, doc in self._query(legacy, embedding, top_k, where)]
+
+        collections = self._collections(state)
+        if len(collections) == 1:
+            return [doc for _, doc in self._query(collections[0], embedding, top_k)]
+        hits = [
+            hit
+            for part in _search_pool.map(lambda c: self._query(c, embedding, top_k), collections)
+            for hit in part
+        ]
+        hits.sort(key=lambda hit: hit[0])
+        return [doc for _, doc in hits[:top_k]]
+
+    def get(self, ids, state=None):
+        # The query's own partitions first; the rest only for ids not found there
+        collections = self._collections(state)
+        if state:
+            collections += [c for c in self._collections() if c not in collections]
+
+        found: Dict[str, Dict[str, Any]] = {}
+        remaining = list(ids)
+        for collection in collections:
+            if not remaining:
+                break
+            rows = collection.get(ids=remaining, include=["documents", "metadatas"])
+            for doc_id, text, metadata in zip(rows["ids"], rows["documents"], rows["metadatas"]):
+                found[doc_id] = to_section_doc(doc_id, text, metadata or {})
+            remaining = [doc_id for doc_id in remaining if doc_id not in found]
+        return found
+
+    def iter_metadata(self):
+        for collection in self._collections():
+            rows = collection.get(include=["metadatas"])
+            for doc_id, metadata in zip(rows["ids"], rows["metadatas"]):
+                yield doc_id, metadata or {}
+
+    def count(self):
+        return sum(c.count() for c in self._collections())
+
+    def fingerprint(self):
+        now = time.monotonic()
+        if self._fingerprint is not None and now - self._fingerprint_at < self._FINGERPRINT_TTL_SECONDS:
+            return self._fingerprint
+        with self._refresh_lock:
+            if self._fingerprint is None or now - self._fingerprint_at >= self._FINGERPRINT_TTL_SECONDS:
+                # Also picks up partitions created by an ingest since the store was opened
+                self._refresh()
+                collections = self._collections()
+                db_file = os.path.join(self.path, "chroma.sqlite3")
+                mtime = os.path.getmtime(db_file) if os.path.exists(db_file) else 0
+                self._fingerprint = f"{len(collections)}:{sum(c.count() for c in collections)}:{int(mtime)}"
+                self._fingerprint_at = time.monotonic()
+        return self._fingerprint
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact dot-product search over a snapshot (core/snapshot.py):
+
+    - embeddings.npy is memory-mapped read-only, so every worker process on the
+      box shares one copy through the OS page cache;
+    - section texts stay on disk; only byte offsets into sections.jsonl and the
+      small metadata fields are held in memory;
+    - rows are grouped by partition (a snapshot exported from a partitioned
+      index stores each partition contiguously, so these are zero-copy slices)
+      and a query only scores the central + its state's partition.
+    """
+
+    name = "numpy"
+    _META_KEYS = ("act", "section", "jurisdiction", "state", "parent_id", "chunk_index")
+
+    def __init__(self, path: str = VECTOR_SNAPSHOT_DIR, block_rows: int = 4096):
+        logging.info(f"📂 Opening NumPy vector snapshot: {path}")
+        self.snapshot = load_snapshot(path, expected_model=EMBEDDING_MODEL_NAME)
+        self.embeddings = self.snapshot.embeddings
+        self.block_rows = block_rows
+        self._sections_path = os.path.join(path, SECTIONS_FILE)
+        self._local = threading.local()
+
+        self.ids: List[str] = []
+        self.offsets: List[int] = []
+        self.metadata: List[Dict[str, Any]] = []
+        with open(self._sections_path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    self.ids.append(row["id"])
+                    self.offsets.append(offset)
+                    self.metadata.append({k: row.get(k) for k in self._META_KEYS})
+                offset += len(line)
+        self.rows = {doc_id: i for i, doc_id in enumerate(self.ids)}
+
+        # partition name → slice of rows (contiguous) or array of row numbers
+        members: Dict[str, List[int]] = {}
+        for i, m in enumerate(self.metadata):
+            members.setdefault(partition_name(m.get("state"), m.get("jurisdiction")), []).append(i)
+        self.partitions: Dict[str, Any] = {}
+        for name, rows in members.items():
+            contiguous = rows[-1] - rows[0] + 1 == len(rows)
+            self.partitions[name] = slice(rows[0], rows[-1] + 1) if contiguous else np.asarray(rows, dtype=np.int64)
+
+        # Ingested MiniLM vectors are already unit-length; rescale scores only if not
+        self.inv_norms = None
+        norms = np.concatenate([
+            np.linalg.norm(np.asarray(self.embeddings[i:i + block_rows], dtype=np.float32), axis=1)
+            for i in range(0, len(self.ids), block_rows)
+        ]) if self.ids else np.ones(0, dtype=np.float32)
+        if norms.size and not np.allclose(norms, 1.0, atol=1e-2):
+            self.inv_norms = (1.0 / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def _blocks(self, rows) -> Iterator[Any]:
+        if isinstance(rows, slice):
+            for i in range(rows.start, rows.stop, self.block_rows):
+                yield slice(i, min(i + self.block_rows, rows.stop))
+        else:
+            for i in range(0, len(rows), self.block_rows):
+                yield rows[i:i + self.block_rows]
+
+    def _search_partition(self, rows, query: np.ndarray, top_k: int) -> List[Tuple[float, int]]:
+        # float32 slices are views of the mmap; float16 blocks are upcast
+        # (BLAS has no fp16 GEMV), which makes float16 snapshots ~10x slower
+        scores = np.concatenate([
+            np.asarray(self.embeddings[block], dtype=np.float32) @ query
+            for block in self._blocks(rows)
+        ])
+        row_ids = np.arange(rows.start, rows.stop) if isinstance(rows, slice) else rows
+        if self.inv_norms is not None:
+            scores *= self.inv_norms[row_ids]
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        return [(float(scores[i]), int(row_ids[i])) for i in best]
+
+    def _read_row(self, row: int) -> Dict[str, Any]:
+        f = getattr(self._local, "file", None)
+        if f is None:
+            f = self._local.file = open(self._sections_path, "rb")
+        f.seek(self.offsets[row])
+        data = json.loads(f.readline())
+        return to_section_doc(data["id"], data.get("text", ""), data)
+
+    def search(self, embedding, top_k, state=None):
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        names = search_partitions(state) if state else list(self.partitions)
+        parts = [self.partitions[n] for n in names if n in self.partitions]
+        if not parts:
+            return []
+        if len(parts) == 1:
+            hits = self._search_partition(parts[0], query, top_k)
+        else:
+            hits = [
+                hit
+                for part in _search_pool.map(lambda rows: self._search_partition(rows, query, top_k), parts)
+                for hit in part
+            ]
+        hits.sort(key=lambda hit: -hit[0])
+        return [self._read_row(row) for _, row in hits[:top_k]]
+
+    def get(self, ids, state=None):
+        return {doc_id: self._read_row(self.rows[doc_id]) for doc_id in ids if doc_id in self.rows}
+
+    def iter_metadata(self):
+        return zip(self.ids, self.metadata)
+
+    def count(self):
+        return len(self.ids)
+
+    def fingerprint(self):
+        return f"{self.snapshot.manifest['snapshot_version']}:{self.count()}"
+
+
+# ================= Shared store (lazy, thread-safe) =================
+# Partitions of one query are searched concurrently (Chroma and BLAS release the GIL)
+_search_pool = ThreadPoolExecutor(max_workers=PARTITION_SEARCH_WORKERS, thread_name_prefix="partition-search")
+
+_store: Optional[VectorStore] = None
+_store_lock = threading.Lock()
+
+
+def create_vector_store(kind: str = VECTOR_STORE) -> VectorStore:
+    if kind == "numpy":
+        if not VECTOR_SNAPSHOT_DIR:
+            raise RuntimeError("VECTOR_STORE=numpy needs VECTOR_SNAPSHOT_DIR (python -m scripts.snapshot export)")
+        return NumpyVectorStore(VECTOR_SNAPSHOT_DIR)
+    if kind != "chroma":
+        logging.warning(f"⚠ Unknown VECTOR_STORE={kind!r} — using Chroma.")
+    return ChromaVectorStore()
+
+
+def get_vector_store() -> VectorStore:
+    """Configured vector store (VECTOR_STORE in config.py), opened once per process."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_vector_store()
+    return _store
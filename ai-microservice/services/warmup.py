@@ -0,0 +1,65 @@
+# services/warmup.py
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from services.citations import get_citation_index
+from services.embeddings import get_embedding_model
+from services.intent import get_intent_classifier
+from services.language import get_language_model
+from services.reranker import get_reranker_model
+from services.retrieval import get_bm25_index
+from services.vector_store import get_vector_store
+
+# Readiness state for /ready (separate from /health, which only says the process is up)
+_state: Dict[str, Any] = {"status": "cold", "error": None, "warmup_seconds": None}
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def warm_up() -> None:
+    """
+    Load the vector index and both models, then run one throwaway inference
+    each so the first real request doesn't pay for lazy init / first-call overhead.
+    Calls the model objects directly, so no cache is populated with warm-up data.
+    """
+    start = time.perf_counter()
+    _state.update(status="warming", error=None)
+    try:
+        store = get_vector_store()
+        logging.info(f"📚 {store.name} vector index ready ({store.count()} vectors)")
+        get_citation_index()
+        get_bm25_index()
+
+        get_embedding_model().encode(["what is the punishment for theft"])
+        get_intent_classifier()
+        get_language_model()
+        get_reranker_model().predict([("what is the punishment for theft", "Whoever commits theft shall be punished.")])
+    except Exception as e:
+        logging.error(f"❌ Warm-up failed: {e}")
+        _state.update(status="failed", error=str(e))
+        return
+
+    elapsed = round(time.perf_counter() - start, 2)
+    _state.update(status="ready", warmup_seconds=elapsed)
+    logging.info(f"✅ Models warm — ready to serve ({elapsed}s)")
+
+
+def start_background_warmup() -> None:
+    """Start warm_up() in a daemon thread, at most once per process."""
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=warm_up, name="model-warmup", daemon=True)
+        _thread.start()
+
+
+def readiness() -> Dict[str, Any]:
+    return dict(_state)
+
+
+def is_ready() -> bool:
+    return _state["status"] == "ready"